@@ -9,11 +9,15 @@ Usage:
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
-from shapely.geometry import shape, Point
-from shapely.prepared import prep
+import shapely
+from shapely.geometry import shape
+import functools
 import json
+import re
 import warnings
 import os
 
@@ -23,6 +27,8 @@ warnings.filterwarnings('ignore')
 DATA_DIR = "data_raw"
 OUTPUT_DIR = "output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+# NYC Open Data (Socrata) floating timestamps, e.g. 2024-02-12T00:00:00.000
+SOCRATA_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
 
 CB5_BOUNDARY_PATH = f"{DATA_DIR}/cb5_boundary.geojson"
 CB5_BOUNDARY_URL = "https://raw.githubusercontent.com/nycehs/NYC_geography/master/CD.geo.json"
@@ -68,6 +74,7 @@ DENIAL_SHADES = ['#8B2020', '#B44040', '#C46060', '#D48080', '#DDA0A0', '#E6B8B8
 CATEGORY_PALETTE = ['#2C5F8B', '#B8860B', '#8B0000', '#006400', '#7B5EA7', '#4A7C6F', '#666666']
 
 
+@functools.lru_cache(maxsize=1)
 def _load_cb5_boundary():
     """Load CB5 boundary GeoJSON, downloading if needed."""
     if os.path.exists(CB5_BOUNDARY_PATH):
@@ -83,17 +90,38 @@ def _load_cb5_boundary():
     for feature in all_districts.get('features', []):
         if feature.get('properties', {}).get('GEOCODE') == 405:
             cb5_geojson = {"type": "FeatureCollection", "features": [feature]}
-            with open(CB5_BOUNDARY_PATH, 'w') as f:
+            # Write then rename so an interrupted download never leaves a partial file
+            tmp_path = f"{CB5_BOUNDARY_PATH}.tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(cb5_geojson, f)
+            os.replace(tmp_path, CB5_BOUNDARY_PATH)
             return cb5_geojson
 
     raise ValueError("Could not find GEOCODE=405 in community districts GeoJSON")
 
 
+@functools.lru_cache(maxsize=1)
 def _load_cb5_polygon():
-    """Load the CB5 boundary as a shapely polygon."""
+    """Load the CB5 boundary as a shapely polygon (cached, prepared)."""
     geojson = _load_cb5_boundary()
-    return shape(geojson['features'][0]['geometry'])
+    poly = shape(geojson['features'][0]['geometry'])
+    shapely.prepare(poly)
+    return poly
+
+
+def _points_in_cb5(lon, lat):
+    """Boolean mask of which (lon, lat) points fall inside the CB5 polygon.
+
+    Cheap bounding-box pass first; the exact polygon test only runs on the
+    survivors. Missing coordinates are reported as outside.
+    """
+    poly = _load_cb5_polygon()
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    minx, miny, maxx, maxy = poly.bounds
+    inside = (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+    inside[inside] = shapely.contains_xy(poly, lon[inside], lat[inside])
+    return inside
 
 
 def _filter_points_in_cb5(df, lat_col='latitude', lon_col='longitude'):
@@ -101,16 +129,11 @@ def _filter_points_in_cb5(df, lat_col='latitude', lon_col='longitude'):
 
     Returns (filtered_df, n_excluded).
     """
-    poly = _load_cb5_polygon()
-    prepared = prep(poly)
-
     has_coords = df[lat_col].notna() & df[lon_col].notna()
     with_coords = df[has_coords]
     n_no_coords = (~has_coords).sum()
 
-    inside = with_coords.apply(
-        lambda r: prepared.contains(Point(r[lon_col], r[lat_col])), axis=1
-    )
+    inside = _points_in_cb5(with_coords[lon_col], with_coords[lat_col])
     filtered = with_coords[inside]
     n_excluded = (~inside).sum() + n_no_coords
     if n_no_coords > 0:
@@ -149,18 +172,23 @@ def prepare_data(signal_studies, srts, crashes, cb5_studies):
         if 'approval' in s or 'approved' in s or 'aps installed' in s or 'aps ranking' in s or 'aps design' in s: return 'approved'
         return 'pending'
 
+    def classify_outcomes(statuses):
+        # Classify each distinct status once, then map (a few dozen calls, not one per row)
+        mapping = {status: classify_outcome(status) for status in statuses.dropna().unique()}
+        return statuses.map(mapping).fillna('unknown')
+
     # Process signal studies
-    signal_studies['outcome'] = signal_studies['statusdescription'].apply(classify_outcome)
-    signal_studies['daterequested'] = pd.to_datetime(signal_studies['daterequested'], errors='coerce')
+    signal_studies['outcome'] = classify_outcomes(signal_studies['statusdescription'])
+    signal_studies['daterequested'] = pd.to_datetime(signal_studies['daterequested'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     signal_studies['year'] = signal_studies['daterequested'].dt.year
 
-    cb5_studies['outcome'] = cb5_studies['statusdescription'].apply(classify_outcome)
-    cb5_studies['daterequested'] = pd.to_datetime(cb5_studies['daterequested'], errors='coerce')
+    cb5_studies['outcome'] = classify_outcomes(cb5_studies['statusdescription'])
+    cb5_studies['daterequested'] = pd.to_datetime(cb5_studies['daterequested'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     cb5_studies['year'] = cb5_studies['daterequested'].dt.year
 
     # Process SRTS
     srts['cb_num'] = pd.to_numeric(srts['cb'], errors='coerce')
-    srts['requestdate'] = pd.to_datetime(srts['requestdate'], errors='coerce')
+    srts['requestdate'] = pd.to_datetime(srts['requestdate'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     srts['year'] = srts['requestdate'].dt.year
 
     # All non-APS records (for volume counts and n= reconciliation: 499 - 65 APS = 434)
@@ -186,7 +214,7 @@ def prepare_data(signal_studies, srts, crashes, cb5_studies):
     print(f"  CB5 SRTS: {len(cb5_srts_raw):,} raw -> {len(cb5_srts):,} after polygon filter ({n_srts_poly} excluded)")
 
     # Process crashes
-    crashes['crash_date'] = pd.to_datetime(crashes['crash_date'], errors='coerce')
+    crashes['crash_date'] = pd.to_datetime(crashes['crash_date'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     crashes['latitude'] = pd.to_numeric(crashes['latitude'], errors='coerce')
     crashes['longitude'] = pd.to_numeric(crashes['longitude'], errors='coerce')
     crashes['number_of_persons_injured'] = pd.to_numeric(crashes['number_of_persons_injured'], errors='coerce').fillna(0)
@@ -1115,7 +1143,7 @@ def _dedup_signal_studies(df):
     keep_as_is = df[~is_dup_candidate]
     dedup_pool = df[is_dup_candidate].copy()
     # Keep one record per external reference (latest status date)
-    dedup_pool['statusdate'] = pd.to_datetime(dedup_pool['statusdate'], errors='coerce')
+    dedup_pool['statusdate'] = pd.to_datetime(dedup_pool['statusdate'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     deduped = dedup_pool.sort_values('statusdate', ascending=False).drop_duplicates(
         subset='externalreferencenumber', keep='first')
     return pd.concat([keep_as_is, deduped], ignore_index=True)
@@ -1215,6 +1243,20 @@ def chart_07_most_denied_streets_speed_bumps(data):
     print("  Chart 07 saved.")
 
 
+# Trailing street-type abbreviations expanded by _normalize_street_name(s)
+_STREET_ABBREVS = {
+    'AVE': 'AVENUE', 'BLVD': 'BOULEVARD', 'RD': 'ROAD',
+    'ST': 'STREET', 'PL': 'PLACE', 'DR': 'DRIVE',
+    'LN': 'LANE', 'CT': 'COURT', 'PKWY': 'PARKWAY',
+    'TPKE': 'TURNPIKE', 'EXPWY': 'EXPRESSWAY',
+}
+_STREET_ABBREV_RE = re.compile(r' (' + '|'.join(_STREET_ABBREVS) + r')$')
+
+
+def _expand_street_abbrev(match):
+    return ' ' + _STREET_ABBREVS[match.group(1)]
+
+
 def _normalize_street_name(name):
     """Normalize street names: strip whitespace, expand abbreviations, title case.
 
@@ -1226,18 +1268,24 @@ def _normalize_street_name(name):
     s = str(name).strip().upper()
     s = ' '.join(s.split())
     # Expand common abbreviations at end of string
-    abbrevs = {
-        ' AVE': ' AVENUE', ' BLVD': ' BOULEVARD', ' RD': ' ROAD',
-        ' ST': ' STREET', ' PL': ' PLACE', ' DR': ' DRIVE',
-        ' LN': ' LANE', ' CT': ' COURT', ' PKWY': ' PARKWAY',
-        ' TPKE': ' TURNPIKE', ' EXPWY': ' EXPRESSWAY',
-    }
-    for abbr, full in abbrevs.items():
-        if s.endswith(abbr):
-            s = s[:-len(abbr)] + full
+    s = _STREET_ABBREV_RE.sub(_expand_street_abbrev, s)
     return s.title()
 
 
+def _normalize_street_names(names):
+    """Vectorized _normalize_street_name over a Series (missing -> '').
+
+    Street names repeat heavily, so each distinct name is normalized once.
+    """
+    codes, uniques = pd.factorize(names)
+    # Trailing '' is picked up by code -1 (missing) in the iloc below
+    s = pd.Series(list(uniques) + [''], dtype=object).astype(str).str.strip().str.upper()
+    s = s.str.replace(r'\s+', ' ', regex=True)
+    s = s.str.replace(_STREET_ABBREV_RE, _expand_street_abbrev, regex=True)
+    s = s.str.title()
+    return s.iloc[codes].set_axis(names.index)
+
+
 def chart_08_crash_hotspots(data):
     """Chart 8: Crash Hotspots — CB5 Queens (2020-2025)."""
     cb5_crashes = data['cb5_crashes'].copy()
@@ -1247,7 +1295,7 @@ def chart_08_crash_hotspots(data):
     cb5_crashes = cb5_crashes[cb5_crashes['year'].between(2020, 2025)]
 
     # Normalize street names to merge variants (e.g., "METROPOLITAN AVE" + "METROPOLITAN AVENUE")
-    cb5_crashes['street_clean'] = cb5_crashes['on_street_name'].apply(_normalize_street_name)
+    cb5_crashes['street_clean'] = _normalize_street_names(cb5_crashes['on_street_name'])
 
     street_crashes = cb5_crashes[cb5_crashes['street_clean'] != ''].groupby('street_clean').agg({
         'collision_id': 'count',
@@ -14,10 +14,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import folium
-from folium.plugins import HeatMap, MarkerCluster
-from shapely.geometry import shape, Point
-from shapely.prepared import prep
+from folium.plugins import MarkerCluster
+from folium.utilities import JsCode
+import shapely
+from shapely.geometry import shape
+import functools
+import hashlib
 import json
+import re
 import warnings
 import os
 import math
@@ -28,8 +32,10 @@ warnings.filterwarnings('ignore')
 DATA_DIR = "data_raw"
 OUTPUT_DIR = "output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+# NYC Open Data (Socrata) floating timestamps, e.g. 2024-02-12T00:00:00.000
+SOCRATA_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
 
-GEOCODE_CACHE_PATH = f"{OUTPUT_DIR}/geocode_cache_signal_studies.csv"
+GEOCODE_CACHE_PATH = f"{OUTPUT_DIR}/geocode_cache_signal_studies.parquet"
 CB5_BOUNDARY_PATH = f"{DATA_DIR}/cb5_boundary.geojson"
 CB5_BOUNDARY_URL = "https://raw.githubusercontent.com/nycehs/NYC_geography/master/CD.geo.json"
 
@@ -43,6 +49,25 @@ GEOCODE_OVERRIDES = {
     'CQ21-0722': (40.7024, -73.8749),  # 74 St & Myrtle Ave — interpolated from crash data
 }
 
+# Raw CSV columns actually used downstream (matching, popups, exports, tables).
+# Reading only these keeps the citywide loads small.
+CRASH_COLUMNS = [
+    'crash_date', 'crash_time', 'latitude', 'longitude',
+    'on_street_name', 'off_street_name', 'cross_street_name',
+    'number_of_persons_injured', 'number_of_persons_killed',
+    'number_of_pedestrians_injured', 'number_of_pedestrians_killed',
+    'number_of_cyclist_injured', 'number_of_cyclist_killed',
+    'number_of_motorist_injured', 'number_of_motorist_killed',
+    'contributing_factor_vehicle_1', 'vehicle_type_code1', 'collision_id',
+]
+SRTS_COLUMNS = [
+    'projectcode', 'cb', 'onstreet', 'fromstreet', 'tostreet',
+    'fromlatitude', 'fromlongitude', 'requestdate', 'closeddate',
+    'segmentstatusdescription', 'projectstatus', 'denialreason',
+    'installationdate', 'trafficdirectiondesc',
+]
+SIGNAL_STUDY_COLUMNS = ['referencenumber', 'borough', 'requesttype', 'statusdescription']
+
 # Data bundle version (semantic versioning)
 DATA_BUNDLE_VERSION = "1.0"
 
@@ -410,6 +435,26 @@ def _classify_outcome(status):
     return 'pending'
 
 
+def _classify_outcomes(statuses):
+    """Vectorized _classify_outcome: classify each distinct status once, then map."""
+    mapping = {status: _classify_outcome(status) for status in statuses.dropna().unique()}
+    return statuses.map(mapping).fillna('unknown')
+
+
+# Trailing street-type abbreviations expanded by _normalize_street_name(s)
+_STREET_ABBREVS = {
+    'AVE': 'AVENUE', 'BLVD': 'BOULEVARD', 'RD': 'ROAD',
+    'ST': 'STREET', 'PL': 'PLACE', 'DR': 'DRIVE',
+    'LN': 'LANE', 'CT': 'COURT', 'PKWY': 'PARKWAY',
+    'TPKE': 'TURNPIKE', 'EXPWY': 'EXPRESSWAY',
+}
+_STREET_ABBREV_RE = re.compile(r' (' + '|'.join(_STREET_ABBREVS) + r')$')
+
+
+def _expand_street_abbrev(match):
+    return ' ' + _STREET_ABBREVS[match.group(1)]
+
+
 def _normalize_street_name(name):
     """Normalize street names for matching: uppercase, expand abbreviations."""
     if pd.isna(name) or str(name).strip() == '':
@@ -418,25 +463,48 @@ def _normalize_street_name(name):
     # Remove extra whitespace
     s = ' '.join(s.split())
     # Expand common abbreviations at end of string
-    abbrevs = {
-        ' AVE': ' AVENUE', ' BLVD': ' BOULEVARD', ' RD': ' ROAD',
-        ' ST': ' STREET', ' PL': ' PLACE', ' DR': ' DRIVE',
-        ' LN': ' LANE', ' CT': ' COURT', ' PKWY': ' PARKWAY',
-        ' TPKE': ' TURNPIKE', ' EXPWY': ' EXPRESSWAY',
-    }
-    for abbr, full in abbrevs.items():
-        if s.endswith(abbr):
-            s = s[:-len(abbr)] + full
-    return s
+    return _STREET_ABBREV_RE.sub(_expand_street_abbrev, s)
+
+
+def _normalize_street_names(names):
+    """Vectorized _normalize_street_name over a Series (missing -> '').
+
+    Street names repeat heavily, so each distinct name is normalized once.
+    """
+    codes, uniques = pd.factorize(names)
+    # Trailing '' is picked up by code -1 (missing) in the iloc below
+    s = pd.Series(list(uniques) + [''], dtype=object).astype(str).str.strip().str.upper()
+    s = s.str.replace(r'\s+', ' ', regex=True)
+    s = s.str.replace(_STREET_ABBREV_RE, _expand_street_abbrev, regex=True)
+    return s.iloc[codes].set_axis(names.index)
 
 
+@functools.lru_cache(maxsize=1)
 def _load_cb5_polygon():
     """Load the CB5 boundary as a shapely polygon for point-in-polygon tests.
 
     Downloads the GeoJSON from NYC geography GitHub repo if not cached locally.
+    Cached per process and returned already prepared for repeated queries.
     """
     geojson = _load_cb5_boundary()
-    return shape(geojson['features'][0]['geometry'])
+    poly = shape(geojson['features'][0]['geometry'])
+    shapely.prepare(poly)
+    return poly
+
+
+def _points_in_cb5(lon, lat):
+    """Boolean mask of which (lon, lat) points fall inside the CB5 polygon.
+
+    Cheap bounding-box pass first; the exact polygon test only runs on the
+    survivors. Missing coordinates are reported as outside.
+    """
+    poly = _load_cb5_polygon()
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    minx, miny, maxx, maxy = poly.bounds
+    inside = (lon >= minx) & (lon <= maxx) & (lat >= miny) & (lat <= maxy)
+    inside[inside] = shapely.contains_xy(poly, lon[inside], lat[inside])
+    return inside
 
 
 def _filter_points_in_cb5(df, lat_col='latitude', lon_col='longitude'):
@@ -444,16 +512,11 @@ def _filter_points_in_cb5(df, lat_col='latitude', lon_col='longitude'):
 
     Returns (filtered_df, n_excluded).
     """
-    poly = _load_cb5_polygon()
-    prepared = prep(poly)
-
     has_coords = df[lat_col].notna() & df[lon_col].notna()
     with_coords = df[has_coords]
     n_no_coords = (~has_coords).sum()
 
-    inside = with_coords.apply(
-        lambda r: prepared.contains(Point(r[lon_col], r[lat_col])), axis=1
-    )
+    inside = _points_in_cb5(with_coords[lon_col], with_coords[lat_col])
     filtered = with_coords[inside]
     n_excluded = (~inside).sum() + n_no_coords
     if n_no_coords > 0:
@@ -461,17 +524,21 @@ def _filter_points_in_cb5(df, lat_col='latitude', lon_col='longitude'):
     return filtered, n_excluded
 
 
-def _load_cb5_srts_full():
+def _load_cb5_srts_full(srts=None):
     """Load CB5 SRTS data with full filtering pipeline (all years).
 
     Applies: cb=405 → polygon filter (CB5 boundary polygon is sole authority).
     Returns all CB5 records (all statuses) with outcome column added
     (denied/approved for resolved, NaN for pending/other).
+
+    Pass the srts_citywide frame from load_and_prepare_data (cb_num/year
+    already parsed) to skip re-reading the CSV.
     """
-    srts = pd.read_csv(f'{DATA_DIR}/srts_citywide.csv', low_memory=False)
-    srts['cb_num'] = pd.to_numeric(srts['cb'], errors='coerce')
-    srts['requestdate'] = pd.to_datetime(srts['requestdate'], errors='coerce')
-    srts['year'] = srts['requestdate'].dt.year
+    if srts is None:
+        srts = pd.read_csv(f'{DATA_DIR}/srts_citywide.csv', low_memory=False)
+        srts['cb_num'] = pd.to_numeric(srts['cb'], errors='coerce')
+        srts['requestdate'] = pd.to_datetime(srts['requestdate'], format=SOCRATA_DATE_FORMAT, errors='coerce')
+        srts['year'] = srts['requestdate'].dt.year
 
     cb5_raw = srts[srts['cb_num'] == 405].copy()
 
@@ -486,16 +553,30 @@ def _load_cb5_srts_full():
     return cb5
 
 
+@functools.lru_cache(maxsize=1)
+def _read_cb5_studies():
+    """Read the curated CB5 signal studies CSV once per process.
+
+    The frame is shared between callers; copy it before adding columns.
+    """
+    return pd.read_csv(f'{OUTPUT_DIR}/data_cb5_signal_studies.csv', low_memory=False)
+
+
 def load_and_prepare_data():
     """Load all datasets and apply standard filtering."""
     print("Loading datasets...")
 
-    signal_studies = pd.read_csv(f'{DATA_DIR}/signal_studies_citywide.csv', low_memory=False)
-    srts = pd.read_csv(f'{DATA_DIR}/srts_citywide.csv', low_memory=False)
-    crashes = pd.read_csv(f'{DATA_DIR}/crashes_queens_2020plus.csv', low_memory=False)
+    signal_studies = pd.read_csv(f'{DATA_DIR}/signal_studies_citywide.csv',
+                                 usecols=SIGNAL_STUDY_COLUMNS, low_memory=False)
+    srts = pd.read_csv(f'{DATA_DIR}/srts_citywide.csv', usecols=SRTS_COLUMNS,
+                       dtype={'fromlatitude': 'float64', 'fromlongitude': 'float64'},
+                       low_memory=False)
+    crashes = pd.read_csv(f'{DATA_DIR}/crashes_queens_2020plus.csv', usecols=CRASH_COLUMNS,
+                          dtype={'latitude': 'float64', 'longitude': 'float64'},
+                          low_memory=False)
     # Pre-filtered CB5 signal studies: Queens borough records filtered to CB5 boundary streets.
     # Curated input — not auto-generated — because signal studies lack a community board field.
-    cb5_studies = pd.read_csv(f'{OUTPUT_DIR}/data_cb5_signal_studies.csv', low_memory=False)
+    cb5_studies = _read_cb5_studies().copy()
 
     print(f"  Signal Studies: {len(signal_studies):,}")
     print(f"  SRTS: {len(srts):,}")
@@ -503,29 +584,25 @@ def load_and_prepare_data():
     print(f"  CB5 Studies: {len(cb5_studies):,}")
 
     # --- Signal studies ---
-    cb5_studies['outcome'] = cb5_studies['statusdescription'].apply(_classify_outcome)
-    cb5_studies['daterequested'] = pd.to_datetime(cb5_studies['daterequested'], errors='coerce')
+    cb5_studies['outcome'] = _classify_outcomes(cb5_studies['statusdescription'])
+    cb5_studies['daterequested'] = pd.to_datetime(cb5_studies['daterequested'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     cb5_studies['year'] = cb5_studies['daterequested'].dt.year
     cb5_resolved = cb5_studies[cb5_studies['outcome'].isin(['denied', 'approved'])]
     cb5_no_aps = cb5_resolved[cb5_resolved['requesttype'] != 'Accessible Pedestrian Signal']
 
     # --- SRTS ---
     srts['cb_num'] = pd.to_numeric(srts['cb'], errors='coerce')
-    srts['requestdate'] = pd.to_datetime(srts['requestdate'], errors='coerce')
+    srts['requestdate'] = pd.to_datetime(srts['requestdate'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     srts['year'] = srts['requestdate'].dt.year
-    srts_resolved = srts[srts['segmentstatusdescription'].isin(['Not Feasible', 'Feasible'])]
-    cb5_srts_raw = srts_resolved[srts_resolved['cb_num'] == 405]
+    resolved_statuses = ['Not Feasible', 'Feasible']
+    n_srts_raw = (srts['segmentstatusdescription'].isin(resolved_statuses) & (srts['cb_num'] == 405)).sum()
 
     # Polygon filter: the CB5 boundary polygon is the sole authority for geographic filtering.
-    cb5_srts = cb5_srts_raw.copy()
-    cb5_srts['outcome'] = cb5_srts['segmentstatusdescription'].map({
-        'Not Feasible': 'denied', 'Feasible': 'approved'
-    })
-    cb5_srts['fromlatitude'] = pd.to_numeric(cb5_srts['fromlatitude'], errors='coerce')
-    cb5_srts['fromlongitude'] = pd.to_numeric(cb5_srts['fromlongitude'], errors='coerce')
-    cb5_srts, n_srts_excluded = _filter_points_in_cb5(
-        cb5_srts, lat_col='fromlatitude', lon_col='fromlongitude')
-    print(f"  CB5 SRTS: {len(cb5_srts_raw):,} raw -> {len(cb5_srts):,} after polygon filter ({n_srts_excluded} excluded)")
+    # Filter all CB5 statuses once; the resolved subset and Charts 13/15 share it.
+    cb5_srts_all = _load_cb5_srts_full(srts)
+    cb5_srts = cb5_srts_all[cb5_srts_all['segmentstatusdescription'].isin(resolved_statuses)]
+    n_srts_excluded = n_srts_raw - len(cb5_srts)
+    print(f"  CB5 SRTS: {n_srts_raw:,} raw -> {len(cb5_srts):,} after polygon filter ({n_srts_excluded} excluded)")
 
     # Filter SRTS to 2020–2025 for consistency with signal studies and crashes
     n_before_year = len(cb5_srts)
@@ -533,14 +610,15 @@ def load_and_prepare_data():
     print(f"  CB5 SRTS: -> {len(cb5_srts):,} after 2020–2025 filter ({n_before_year - len(cb5_srts)} excluded)")
 
     # --- Crashes ---
-    crashes['crash_date'] = pd.to_datetime(crashes['crash_date'], errors='coerce')
+    crashes['crash_date'] = pd.to_datetime(crashes['crash_date'], format=SOCRATA_DATE_FORMAT, errors='coerce')
     crashes['year'] = crashes['crash_date'].dt.year
-    crashes = crashes[crashes['year'].between(2020, 2025)]
-    crashes['latitude'] = pd.to_numeric(crashes['latitude'], errors='coerce')
-    crashes['longitude'] = pd.to_numeric(crashes['longitude'], errors='coerce')
-    crashes['number_of_persons_injured'] = pd.to_numeric(crashes['number_of_persons_injured'], errors='coerce').fillna(0)
-    crashes['number_of_pedestrians_injured'] = pd.to_numeric(crashes['number_of_pedestrians_injured'], errors='coerce').fillna(0)
-    crashes['number_of_persons_killed'] = pd.to_numeric(crashes['number_of_persons_killed'], errors='coerce').fillna(0)
+    # Source is 2020+ but includes the partial current year, so the upper bound matters
+    crash_year = crashes['year'].to_numpy()
+    crashes = crashes[(crash_year >= 2020) & (crash_year <= 2025)]
+    # Per-crash counts are small integers; int16 keeps the proximity scan narrow.
+    # Coordinates stay float64 so geocode medians and the 150m cutoff are exact.
+    for col in ['number_of_persons_injured', 'number_of_pedestrians_injured', 'number_of_persons_killed']:
+        crashes[col] = pd.to_numeric(crashes[col], errors='coerce').fillna(0).astype('int16')
 
     # Polygon filter: Crashes — use actual CB5 boundary, not bounding box
     cb5_crashes, n_crash_excluded = _filter_points_in_cb5(crashes)
@@ -552,6 +630,7 @@ def load_and_prepare_data():
         'cb5_no_aps': cb5_no_aps,
         'srts': srts,
         'cb5_srts': cb5_srts,
+        'cb5_srts_all': cb5_srts_all,
         'crashes': crashes,
         'cb5_crashes': cb5_crashes,
     }
@@ -573,23 +652,21 @@ def _build_crash_location_lookup(crashes):
         crashes['longitude'].notna()
     ].copy()
 
-    df['street_a'] = df['on_street_name'].apply(_normalize_street_name)
-    df['street_b'] = df['off_street_name'].apply(_normalize_street_name)
+    df['street_a'] = _normalize_street_names(df['on_street_name'])
+    df['street_b'] = _normalize_street_names(df['off_street_name'])
     df = df[(df['street_a'] != '') & (df['street_b'] != '')]
 
     # Canonical key: sorted pair
-    def _sort_pair(row):
-        a, b = sorted([row['street_a'], row['street_b']])
-        return pd.Series({'key_a': a, 'key_b': b})
-
-    keys = df.apply(_sort_pair, axis=1)
-    df['key_a'] = keys['key_a']
-    df['key_b'] = keys['key_b']
+    swap = df['street_a'] > df['street_b']
+    df['key_a'] = df['street_a'].where(~swap, df['street_b'])
+    df['key_b'] = df['street_b'].where(~swap, df['street_a'])
 
-    lookup = df.groupby(['key_a', 'key_b']).agg(
+    # Output feeds dict lookups, so group order doesn't matter; coords are
+    # already non-null, so size == count.
+    lookup = df.groupby(['key_a', 'key_b'], sort=False, observed=True).agg(
         lat=('latitude', 'median'),
         lon=('longitude', 'median'),
-        n=('latitude', 'count')
+        n=('latitude', 'size')
     ).reset_index()
     lookup.rename(columns={'key_a': 'street_a', 'key_b': 'street_b'}, inplace=True)
     return lookup
@@ -606,23 +683,22 @@ def _build_srts_location_lookup(srts):
     df['fromlongitude'] = pd.to_numeric(df['fromlongitude'], errors='coerce')
     df = df[df['fromlatitude'].notna() & df['fromlongitude'].notna()]
 
-    results = {}
-    for _, row in df.iterrows():
-        main = _normalize_street_name(row.get('onstreet', ''))
-        from_st = _normalize_street_name(row.get('fromstreet', ''))
-        to_st = _normalize_street_name(row.get('tostreet', ''))
-        lat = row['fromlatitude']
-        lon = row['fromlongitude']
-
-        if main and from_st:
-            key = tuple(sorted([main, from_st]))
-            if key not in results:
-                results[key] = (lat, lon)
-        if main and to_st:
-            key = tuple(sorted([main, to_st]))
-            if key not in results:
-                results[key] = (lat, lon)
-    return results
+    # Candidate pairs in row order: each row's (main, from) then (main, to).
+    # The first occurrence of a sorted pair wins.
+    main = np.repeat(_normalize_street_names(df['onstreet']).to_numpy(dtype=object), 2)
+    other = np.column_stack([
+        _normalize_street_names(df['fromstreet']).to_numpy(dtype=object),
+        _normalize_street_names(df['tostreet']).to_numpy(dtype=object),
+    ]).ravel()
+    swap = main > other
+    pairs = pd.DataFrame({
+        'key_a': np.where(swap, other, main),
+        'key_b': np.where(swap, main, other),
+        'lat': np.repeat(df['fromlatitude'].to_numpy(), 2),
+        'lon': np.repeat(df['fromlongitude'].to_numpy(), 2),
+    })
+    pairs = pairs[(main != '') & (other != '')].drop_duplicates(subset=['key_a', 'key_b'])
+    return dict(zip(zip(pairs['key_a'], pairs['key_b']), zip(pairs['lat'], pairs['lon'])))
 
 
 def _build_street_lines(crash_lookup, srts_lookup):
@@ -630,50 +706,136 @@ def _build_street_lines(crash_lookup, srts_lookup):
 
     Returns dict: street_name -> (slope, intercept) for lat=f(lon).
     """
-    street_points = {}
-
-    # From crash lookup
-    for _, row in crash_lookup.iterrows():
-        for street in [row['street_a'], row['street_b']]:
-            if street not in street_points:
-                street_points[street] = []
-            street_points[street].append((row['lon'], row['lat']))
-
-    # From SRTS lookup
-    for (s1, s2), (lat, lon) in srts_lookup.items():
-        for street in [s1, s2]:
-            if street not in street_points:
-                street_points[street] = []
-            street_points[street].append((lon, lat))
-
-    street_lines = {}
-    for street, points in street_points.items():
-        if len(points) < 2:
-            continue
-        lons = np.array([p[0] for p in points])
-        lats = np.array([p[1] for p in points])
-
-        # Simple linear regression: lat = slope * lon + intercept
-        if np.std(lons) < 1e-8:
-            continue  # vertical line, skip
-        slope, intercept = np.polyfit(lons, lats, 1)
-        street_lines[street] = (slope, intercept)
-
-    return street_lines
-
-
-def _intersect_lines(line1, line2):
-    """Find intersection of two lines: lat = slope * lon + intercept.
-
-    Returns (lat, lon) or None if parallel.
+    # Every known point contributes once to each of its two streets
+    srts_pairs = list(srts_lookup.keys())
+    srts_coords = np.array(list(srts_lookup.values()), dtype=float).reshape(-1, 2)
+    streets = np.concatenate([
+        crash_lookup['street_a'].to_numpy(dtype=object),
+        crash_lookup['street_b'].to_numpy(dtype=object),
+        np.array([p[0] for p in srts_pairs], dtype=object),
+        np.array([p[1] for p in srts_pairs], dtype=object),
+    ])
+    crash_lons = crash_lookup['lon'].to_numpy(dtype=float)
+    crash_lats = crash_lookup['lat'].to_numpy(dtype=float)
+    lons = np.concatenate([crash_lons, crash_lons, srts_coords[:, 1], srts_coords[:, 1]])
+    lats = np.concatenate([crash_lats, crash_lats, srts_coords[:, 0], srts_coords[:, 0]])
+
+    codes, names = pd.factorize(streets)
+    valid = codes >= 0
+    codes, lons, lats = codes[valid], lons[valid], lats[valid]
+    if len(codes) == 0:
+        return {}
+
+    # Sort by street so each street's points form one contiguous segment
+    order = np.argsort(codes, kind='stable')
+    codes, lons, lats = codes[order], lons[order], lats[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    n = np.diff(np.r_[starts, len(codes)])
+
+    # Closed-form least squares per street: lat = slope * lon + intercept
+    mean_lon = np.add.reduceat(lons, starts) / n
+    mean_lat = np.add.reduceat(lats, starts) / n
+    dlon = lons - np.repeat(mean_lon, n)
+    dlat = lats - np.repeat(mean_lat, n)
+    sxx = np.add.reduceat(dlon * dlon, starts)
+    sxy = np.add.reduceat(dlon * dlat, starts)
+
+    # Need 2+ points and a non-vertical line (std of lons >= 1e-8)
+    keep = (n >= 2) & (np.sqrt(sxx / n) >= 1e-8)
+    slope = sxy[keep] / sxx[keep]
+    intercept = mean_lat[keep] - slope * mean_lon[keep]
+    street_names = names[codes[starts][keep]]
+
+    return dict(zip(street_names, zip(slope.tolist(), intercept.tolist())))
+
+
+def _street_pairs(main_norm, cross_norm):
+    """Normalized (main, cross) names as object arrays, missing -> ''."""
+    main = pd.Series(main_norm, dtype=object).fillna('').to_numpy()
+    cross = pd.Series(cross_norm, dtype=object).fillna('').to_numpy()
+    return main, cross
+
+
+def _pair_lookup_coords(main, cross, lookup):
+    """Look up sorted (main, cross) street pairs in a coordinate lookup.
+
+    lookup is a DataFrame with 'lat'/'lon' columns indexed by sorted
+    (street_a, street_b) pairs. Returns (lats, lons), NaN where not found.
+    """
+    swap = main > cross
+    keys = pd.MultiIndex.from_arrays([np.where(swap, cross, main), np.where(swap, main, cross)])
+    coords = lookup.reindex(keys)
+    return coords['lat'].to_numpy(dtype=float), coords['lon'].to_numpy(dtype=float)
+
+
+def _srts_lookup_frame(srts_lookup):
+    """_build_srts_location_lookup dict as a lookup frame for _pair_lookup_coords."""
+    return pd.DataFrame(list(srts_lookup.values()), columns=['lat', 'lon'],
+                        index=pd.MultiIndex.from_tuples(list(srts_lookup), names=['street_a', 'street_b']))
+
+
+def _street_line_coords(main, cross, street_lines):
+    """Intersect the street lines (lat = slope * lon + intercept) of each pair.
+
+    Returns (lats, lons), NaN where either street has no line or the
+    lines are parallel.
+    """
+    lines = pd.DataFrame.from_dict(street_lines, orient='index', columns=['slope', 'intercept'])
+    s1, i1 = lines.reindex(main).to_numpy(dtype=float).T
+    s2, i2 = lines.reindex(cross).to_numpy(dtype=float).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ds = np.where(np.abs(s1 - s2) < 1e-10, np.nan, s1 - s2)
+        lons = (i2 - i1) / ds
+        lats = s1 * lons + i1
+    return lats, lons
+
+
+def _fill_geocode_tier(lats, lons, geo_tier, todo, cand_lats, cand_lons, tier):
+    """Fill still-missing rows (todo & NaN) whose candidate falls inside CB5.
+
+    Updates lats/lons/geo_tier in place and returns the number filled.
+    """
+    take = todo & np.isnan(lats) & _points_in_cb5(cand_lons, cand_lats)
+    lats[take] = cand_lats[take]
+    lons[take] = cand_lons[take]
+    geo_tier[take] = tier
+    return int(take.sum())
+
+
+def _read_geocode_cache(columns=None):
+    """Load the geocode cache.
+
+    Returns None if no cache exists. ``geocode_tier`` is returned as plain
+    strings since callers rewrite it in place.
+    """
+    if os.path.exists(GEOCODE_CACHE_PATH):
+        cache = pd.read_parquet(GEOCODE_CACHE_PATH, columns=columns)
+    else:
+        return None
+    if 'geocode_tier' in cache.columns:
+        cache['geocode_tier'] = cache['geocode_tier'].astype(object)
+    return cache
+
+
+def _cb5_polygon_fingerprint():
+    """SHA-1 of the CB5 polygon WKB; stored with the geocode cache."""
+    return hashlib.sha1(_load_cb5_polygon().wkb).hexdigest()
+
+
+def _write_geocode_cache(cache):
+    """Write the geocode cache to Parquet, storing repeated strings as categoricals.
+
+    Geocoded coordinates have been checked against the current CB5 polygon,
+    so its fingerprint is stored in the Parquet metadata (DataFrame.attrs).
+    GEOCODE_OVERRIDES rows are not checked here; the loader re-checks them
+    on every run.
     """
-    s1, i1 = line1
-    s2, i2 = line2
-    if abs(s1 - s2) < 1e-10:
-        return None  # parallel
-    lon = (i2 - i1) / (s1 - s2)
-    lat = s1 * lon + i1
-    return (lat, lon)
+    out = cache.copy()
+    for col in ('main_norm', 'cross_norm', 'geocode_tier'):
+        if col in out.columns:
+            out[col] = out[col].astype('category')
+    out.attrs['cb5_polygon_sha1'] = _cb5_polygon_fingerprint()
+    out.to_parquet(GEOCODE_CACHE_PATH, index=False)
 
 
 def geocode_signal_studies(data):
@@ -685,26 +847,25 @@ def geocode_signal_studies(data):
     3. Street-line intersection estimation
     """
     cb5_no_aps = data['cb5_no_aps'].copy()
-    cb5_poly = _load_cb5_polygon()
-    prepared_poly = prep(cb5_poly)
-
-    def _in_cb5(lat, lon):
-        return prepared_poly.contains(Point(lon, lat))
 
     # Check cache — but re-validate against polygon
-    if os.path.exists(GEOCODE_CACHE_PATH):
+    cache = _read_geocode_cache()
+    if cache is not None:
         print("  Loading geocode cache...")
-        cache = pd.read_csv(GEOCODE_CACHE_PATH)
-        # Re-filter cached results against polygon (cache may predate polygon fix)
-        has_coords = cache['latitude'].notna() & cache['longitude'].notna()
-        if has_coords.any():
-            inside = cache[has_coords].apply(
-                lambda r: _in_cb5(r['latitude'], r['longitude']), axis=1)
-            n_outside = (~inside).sum()
-            if n_outside > 0:
-                print(f"  Removing {n_outside} cached points outside CB5 polygon")
-                cache.loc[has_coords & ~inside.reindex(cache.index, fill_value=True), ['latitude', 'longitude']] = np.nan
-                cache.loc[has_coords & ~inside.reindex(cache.index, fill_value=True), 'geocode_tier'] = ''
+        # Re-filter cached results against polygon (cache may predate polygon fix).
+        # When the cache was written against this exact polygon only the manual
+        # overrides need the check, since they never went through the tiers.
+        check = cache['latitude'].notna() & cache['longitude'].notna()
+        if cache.attrs.get('cb5_polygon_sha1') == _cb5_polygon_fingerprint():
+            check &= cache['geocode_tier'] == 'manual'
+        # Unchecked rows are masked to NaN, which fail the bounding box for free
+        outside = check & ~_points_in_cb5(cache['longitude'].where(check),
+                                          cache['latitude'].where(check))
+        n_outside = outside.sum()
+        if n_outside > 0:
+            print(f"  Removing {n_outside} cached points outside CB5 polygon")
+            cache.loc[outside, ['latitude', 'longitude']] = np.nan
+            cache.loc[outside, 'geocode_tier'] = ''
 
         # Clear stale-tier geocodes (old interpolation methods) for re-processing
         stale_tiers = {'crash_interp_cb5', 'srts_interp_cb5', 'srts_cb5'}
@@ -720,50 +881,27 @@ def geocode_signal_studies(data):
             print(f"  Re-geocoding {needs_geocode.sum()} records...")
             # Ensure normalized street names exist
             if 'main_norm' not in cache.columns:
-                cache['main_norm'] = cache['mainstreet'].apply(_normalize_street_name)
-                cache['cross_norm'] = cache['crossstreet1'].apply(_normalize_street_name)
+                cache['main_norm'] = _normalize_street_names(cache['mainstreet'])
+                cache['cross_norm'] = _normalize_street_names(cache['crossstreet1'])
             crash_lookup = _build_crash_location_lookup(data['crashes'])
             srts_lookup = _build_srts_location_lookup(data['srts'])
-            crash_keys = {}
-            for idx, row in crash_lookup.iterrows():
-                key = tuple(sorted([row['street_a'], row['street_b']]))
-                crash_keys[key] = (row['lat'], row['lon'])
-            srts_keys = dict(srts_lookup)
             street_lines = _build_street_lines(crash_lookup, srts_lookup)
 
-            re_t1 = re_t2 = re_t3 = 0
-            for i in cache.index[needs_geocode]:
-                main = cache.at[i, 'main_norm']
-                cross = cache.at[i, 'cross_norm']
-                if not main or not cross or pd.isna(main) or pd.isna(cross):
-                    continue
-                key = tuple(sorted([main, cross]))
-                # Tier 1: crash match
-                if key in crash_keys:
-                    lat, lon = crash_keys[key]
-                    if _in_cb5(lat, lon):
-                        cache.at[i, 'latitude'] = lat
-                        cache.at[i, 'longitude'] = lon
-                        cache.at[i, 'geocode_tier'] = 'crash'
-                        re_t1 += 1; continue
-                # Tier 2: SRTS match
-                if key in srts_keys:
-                    lat, lon = srts_keys[key]
-                    if _in_cb5(lat, lon):
-                        cache.at[i, 'latitude'] = lat
-                        cache.at[i, 'longitude'] = lon
-                        cache.at[i, 'geocode_tier'] = 'srts'
-                        re_t2 += 1; continue
-                # Tier 3: street-line intersection
-                if main in street_lines and cross in street_lines:
-                    result = _intersect_lines(street_lines[main], street_lines[cross])
-                    if result is not None:
-                        lat, lon = result
-                        if _in_cb5(lat, lon):
-                            cache.at[i, 'latitude'] = lat
-                            cache.at[i, 'longitude'] = lon
-                            cache.at[i, 'geocode_tier'] = 'street_line'
-                            re_t3 += 1
+            main, cross = _street_pairs(cache['main_norm'], cache['cross_norm'])
+            todo = needs_geocode.to_numpy() & (main != '') & (cross != '')
+            lats = cache['latitude'].to_numpy(dtype=float, copy=True)
+            lons = cache['longitude'].to_numpy(dtype=float, copy=True)
+            geo_tier = cache['geocode_tier'].to_numpy(dtype=object, copy=True)
+            crash_xy = crash_lookup.set_index(['street_a', 'street_b'])[['lat', 'lon']]
+            re_t1 = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                       *_pair_lookup_coords(main, cross, crash_xy), 'crash')
+            re_t2 = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                       *_pair_lookup_coords(main, cross, _srts_lookup_frame(srts_lookup)), 'srts')
+            re_t3 = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                       *_street_line_coords(main, cross, street_lines), 'street_line')
+            cache['latitude'] = lats
+            cache['longitude'] = lons
+            cache['geocode_tier'] = geo_tier
             print(f"    Re-geocoded: {re_t1} crash, {re_t2} SRTS, {re_t3} street-line")
 
         # Apply manual overrides
@@ -774,7 +912,7 @@ def geocode_signal_studies(data):
                 cache.loc[mask, 'geocode_tier'] = 'manual'
                 print(f"  Override applied: {ref} → ({lat}, {lon})")
 
-        cache.to_csv(GEOCODE_CACHE_PATH, index=False)
+        _write_geocode_cache(cache)
         geocoded = cache['latitude'].notna().sum()
         print(f"  Cache: {len(cache)} records, {geocoded} geocoded ({geocoded/len(cache)*100:.0f}%)")
         return cache
@@ -782,8 +920,8 @@ def geocode_signal_studies(data):
     print("  Geocoding signal study intersections...")
 
     # Normalize signal study street names
-    cb5_no_aps['main_norm'] = cb5_no_aps['mainstreet'].apply(_normalize_street_name)
-    cb5_no_aps['cross_norm'] = cb5_no_aps['crossstreet1'].apply(_normalize_street_name)
+    cb5_no_aps['main_norm'] = _normalize_street_names(cb5_no_aps['mainstreet'])
+    cb5_no_aps['cross_norm'] = _normalize_street_names(cb5_no_aps['crossstreet1'])
 
     # Build lookups
     print("    Building crash location lookup...")
@@ -798,50 +936,21 @@ def geocode_signal_studies(data):
     lats = np.full(len(cb5_no_aps), np.nan)
     lons = np.full(len(cb5_no_aps), np.nan)
     geo_tier = np.full(len(cb5_no_aps), '', dtype=object)
+    main, cross = _street_pairs(cb5_no_aps['main_norm'], cb5_no_aps['cross_norm'])
+    todo = (main != '') & (cross != '')
 
     # Tier 1: Crash data matching
-    crash_keys = {}
-    for idx, row in crash_lookup.iterrows():
-        key = tuple(sorted([row['street_a'], row['street_b']]))
-        crash_keys[key] = (row['lat'], row['lon'])
-
-    tier1_count = 0
-    for i, (_, row) in enumerate(cb5_no_aps.iterrows()):
-        main = row['main_norm']
-        cross = row['cross_norm']
-        if not main or not cross:
-            continue
-
-        key = tuple(sorted([main, cross]))
-        if key in crash_keys:
-            lat, lon = crash_keys[key]
-            if _in_cb5(lat, lon):
-                lats[i] = lat
-                lons[i] = lon
-                geo_tier[i] = 'crash'
-                tier1_count += 1
+    crash_xy = crash_lookup.set_index(['street_a', 'street_b'])[['lat', 'lon']]
+    tier1_count = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                     *_pair_lookup_coords(main, cross, crash_xy), 'crash')
 
     print(f"    Tier 1 (crash match): {tier1_count}/{len(cb5_no_aps)} "
           f"({tier1_count/len(cb5_no_aps)*100:.0f}%)")
 
     # Tier 2: SRTS matching
-    tier2_count = 0
-    for i, (_, row) in enumerate(cb5_no_aps.iterrows()):
-        if not np.isnan(lats[i]):
-            continue
-        main = row['main_norm']
-        cross = row['cross_norm']
-        if not main or not cross:
-            continue
-
-        key = tuple(sorted([main, cross]))
-        if key in srts_lookup:
-            lat, lon = srts_lookup[key]
-            if _in_cb5(lat, lon):
-                lats[i] = lat
-                lons[i] = lon
-                geo_tier[i] = 'srts'
-                tier2_count += 1
+    tier2_count = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                     *_pair_lookup_coords(main, cross, _srts_lookup_frame(srts_lookup)),
+                                     'srts')
 
     print(f"    Tier 2 (SRTS match): {tier2_count}/{len(cb5_no_aps)} "
           f"({tier2_count/len(cb5_no_aps)*100:.0f}%)")
@@ -851,26 +960,8 @@ def geocode_signal_studies(data):
     street_lines = _build_street_lines(crash_lookup, srts_lookup)
     print(f"    Street lines: {len(street_lines)} streets with regression lines")
 
-    tier3_count = 0
-    for i, (_, row) in enumerate(cb5_no_aps.iterrows()):
-        if not np.isnan(lats[i]):
-            continue
-        main = row['main_norm']
-        cross = row['cross_norm']
-        if not main or not cross:
-            continue
-        if main not in street_lines or cross not in street_lines:
-            continue
-
-        result = _intersect_lines(street_lines[main], street_lines[cross])
-        if result is None:
-            continue
-        lat, lon = result
-        if _in_cb5(lat, lon):
-            lats[i] = lat
-            lons[i] = lon
-            geo_tier[i] = 'street_line'
-            tier3_count += 1
+    tier3_count = _fill_geocode_tier(lats, lons, geo_tier, todo,
+                                     *_street_line_coords(main, cross, street_lines), 'street_line')
 
     print(f"    Tier 3 (street-line): {tier3_count}/{len(cb5_no_aps)} "
           f"({tier3_count/len(cb5_no_aps)*100:.0f}%)")
@@ -892,80 +983,92 @@ def geocode_signal_studies(data):
                   'latitude', 'longitude',
                   'geocode_tier', 'main_norm', 'cross_norm']
     cache_df = cb5_no_aps[[c for c in cache_cols if c in cb5_no_aps.columns]].copy()
-    cache_df.to_csv(GEOCODE_CACHE_PATH, index=False)
+    _write_geocode_cache(cache_df)
     print(f"    Cache saved to {GEOCODE_CACHE_PATH}")
 
     return cache_df
 
 
 # ============================================================
-# Step 2: Proximity Analysis (Haversine)
+# Step 2: Proximity Analysis (150m radius)
 # ============================================================
 
-def _haversine_m(lat1, lon1, lat2, lon2):
-    """Haversine distance in meters between two points."""
-    R = 6371000  # Earth radius in meters
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlam = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+def _equirect_angle_sq(lat1, lon1, lat2, lon2):
+    """Squared equirectangular angular distance in radians^2 (elementwise).
 
+    Multiply the square root by the earth radius for meters. Uses the pair's
+    mean latitude; at the 150m scale it agrees with haversine to well under
+    1 cm. Radius tests compare against (radius_m / R) ** 2 directly.
+    """
+    dy = np.radians(lat2 - lat1)
+    dx = np.radians(lon2 - lon1) * np.cos(np.radians((lat1 + lat2) / 2))
+    return dx * dx + dy * dy
 
-def _haversine_vectorized(lat1, lon1, lat2_arr, lon2_arr):
-    """Haversine distance from one point to arrays of points. Returns meters."""
-    R = 6371000
-    phi1 = np.radians(lat1)
-    phi2 = np.radians(lat2_arr)
-    dphi = np.radians(lat2_arr - lat1)
-    dlam = np.radians(lon2_arr - lon1)
-    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
-    return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
+def _pairs_within_radius(lats, lons, crash_lats, crash_lons, radius_m=PROXIMITY_RADIUS_M):
+    """Find every (location, crash) pair closer than radius_m.
 
-def compute_proximity(locations_df, crashes_df, radius_m=PROXIMITY_RADIUS_M):
-    """For each location, count crashes/injuries within radius.
+    Crashes are indexed by sorted latitude; each location only runs the
+    distance test on crashes inside its latitude band, since the distance is
+    never shorter than the latitude arc. Locations with missing coordinates
+    match nothing.
 
-    locations_df must have 'latitude', 'longitude' columns.
-    Returns DataFrame with added columns: crashes_150m, injuries_150m,
-    ped_injuries_150m, fatalities_150m.
+    Returns (loc_idx, crash_idx) arrays, grouped by location in order.
     """
-    crash_lats = crashes_df['latitude'].values
-    crash_lons = crashes_df['longitude'].values
-    crash_injuries = crashes_df['number_of_persons_injured'].values
-    crash_ped_injuries = crashes_df['number_of_pedestrians_injured'].values
-    crash_fatalities = crashes_df['number_of_persons_killed'].values
+    order = np.argsort(crash_lats, kind='stable')
+    sorted_lats = crash_lats[order]
+    sorted_lons = crash_lons[order]
+    band_deg = np.degrees(radius_m / 6371000) + 1e-9
 
-    results = {
-        'crashes_150m': [],
-        'injuries_150m': [],
-        'ped_injuries_150m': [],
-        'fatalities_150m': [],
-    }
-
-    for _, row in locations_df.iterrows():
-        lat = row['latitude']
-        lon = row['longitude']
+    valid = ~(np.isnan(lats) | np.isnan(lons))
+    starts = np.searchsorted(sorted_lats, lats - band_deg, side='left')
+    stops = np.searchsorted(sorted_lats, lats + band_deg, side='right')
+    n_cand = np.where(valid, np.maximum(stops - starts, 0), 0)
 
-        if pd.isna(lat) or pd.isna(lon):
-            for key in results:
-                results[key].append(np.nan)
-            continue
+    # Flatten every location's band into (location, crash) index pairs
+    seg_start = np.cumsum(n_cand) - n_cand
+    loc_idx = np.repeat(np.arange(len(lats)), n_cand)
+    band_idx = np.arange(n_cand.sum()) - np.repeat(seg_start - starts, n_cand)
 
-        dists = _haversine_vectorized(lat, lon, crash_lats, crash_lons)
-        mask = dists <= radius_m
+    angle_sq = _equirect_angle_sq(lats[loc_idx], lons[loc_idx],
+                                  sorted_lats[band_idx], sorted_lons[band_idx])
+    hit = angle_sq <= (radius_m / 6371000) ** 2
+    return loc_idx[hit], order[band_idx[hit]]
 
-        results['crashes_150m'].append(mask.sum())
-        results['injuries_150m'].append(crash_injuries[mask].sum())
-        results['ped_injuries_150m'].append(crash_ped_injuries[mask].sum())
-        results['fatalities_150m'].append(crash_fatalities[mask].sum())
 
-    for key, vals in results.items():
-        locations_df = locations_df.copy()
-        locations_df[key] = vals
+def compute_proximity(locations_df, crashes_df, radius_m=PROXIMITY_RADIUS_M):
+    """For each location, count crashes/injuries within radius.
 
-    return locations_df
+    locations_df must have 'latitude', 'longitude' columns.
+    Returns DataFrame with added columns: crashes_150m, injuries_150m,
+    ped_injuries_150m, fatalities_150m.
+    """
+    metrics = ['crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
+    # Per-crash contributions to each metric as one (C, 4) int64 block
+    crash_stats = np.column_stack([
+        np.ones(len(crashes_df), dtype=np.int64),
+        crashes_df['number_of_persons_injured'].values,
+        crashes_df['number_of_pedestrians_injured'].values,
+        crashes_df['number_of_persons_killed'].values,
+    ]).astype(np.int64)
+
+    loc_lats = locations_df['latitude'].to_numpy(dtype=float)
+    loc_lons = locations_df['longitude'].to_numpy(dtype=float)
+    valid = ~(np.isnan(loc_lats) | np.isnan(loc_lons))
+    loc_idx, crash_idx = _pairs_within_radius(
+        loc_lats, loc_lons, crashes_df['latitude'].to_numpy(dtype=float),
+        crashes_df['longitude'].to_numpy(dtype=float), radius_m)
+
+    # Pairs are grouped by location, so per-location sums are cumsum diffs
+    n_hits = np.bincount(loc_idx, minlength=len(loc_lats))
+    hit_end = np.cumsum(n_hits)
+    totals = np.vstack([np.zeros((1, len(metrics)), dtype=np.int64),
+                        np.cumsum(crash_stats[crash_idx], axis=0)])
+    sums = totals[hit_end] - totals[hit_end - n_hits]
+
+    if not valid.all():
+        sums = np.where(valid[:, None], sums, np.nan)
+    return locations_df.assign(**dict(zip(metrics, sums.T)))
 
 
 def _mann_whitney_u(x, y):
@@ -983,24 +1086,11 @@ def _mann_whitney_u(x, y):
     if n1 == 0 or n2 == 0:
         return np.nan, np.nan
 
-    # Rank all values together
+    # Rank all values together; tied values share their average rank
     combined = np.concatenate([x, y])
-    order = np.argsort(combined)
-    ranks = np.empty_like(order, dtype=float)
-    ranks[order] = np.arange(1, len(combined) + 1, dtype=float)
-
-    # Handle ties: average ranks for tied values
-    sorted_combined = combined[order]
-    i = 0
-    while i < len(sorted_combined):
-        j = i + 1
-        while j < len(sorted_combined) and sorted_combined[j] == sorted_combined[i]:
-            j += 1
-        if j > i + 1:
-            avg_rank = np.mean(ranks[order[i:j]])
-            for k in range(i, j):
-                ranks[order[k]] = avg_rank
-        i = j
+    _, inverse, counts = np.unique(combined, return_inverse=True, return_counts=True)
+    rank_ends = np.cumsum(counts)
+    ranks = (rank_ends - (counts - 1) / 2)[inverse]
 
     R1 = ranks[:n1].sum()
     U1 = R1 - n1 * (n1 + 1) / 2
@@ -1012,15 +1102,8 @@ def _mann_whitney_u(x, y):
         return U1, 1.0
 
     z = (U1 - mu) / sigma
-    # Two-sided p-value via normal CDF approximation (Abramowitz & Stegun)
-    az = abs(z)
-    # Simple CDF approximation
-    t = 1.0 / (1.0 + 0.2316419 * az)
-    d = 0.3989422804014327  # 1/sqrt(2*pi)
-    p_one = d * math.exp(-0.5 * az * az) * (
-        t * (0.319381530 + t * (-0.356563782 + t * (1.781477937 + t * (-1.821255978 + t * 1.330274429))))
-    )
-    p_two = 2 * p_one
+    # Two-sided p-value from the normal tail: P(|Z| > |z|) = erfc(|z| / sqrt(2))
+    p_two = math.erfc(abs(z) / math.sqrt(2))
 
     return U1, min(p_two, 1.0)
 
@@ -1028,19 +1111,36 @@ def _mann_whitney_u(x, y):
 def run_proximity_analysis(signal_geo, srts_df, cb5_crashes):
     """Run proximity analysis for both signal studies and SRTS."""
     print("\n  Computing proximity for signal studies...")
-    signal_with_coords = signal_geo[signal_geo['latitude'].notna()].copy()
+    signal_with_coords = signal_geo[signal_geo['latitude'].notna()]
     signal_prox = compute_proximity(signal_with_coords, cb5_crashes)
 
     print("  Computing proximity for SRTS...")
-    srts_with_coords = srts_df.copy()
-    srts_with_coords['latitude'] = pd.to_numeric(srts_with_coords['fromlatitude'], errors='coerce')
-    srts_with_coords['longitude'] = pd.to_numeric(srts_with_coords['fromlongitude'], errors='coerce')
-    srts_with_coords = srts_with_coords[srts_with_coords['latitude'].notna()].copy()
+    # Filter to located rows first, then attach coordinates in one assign()
+    srts_lat = pd.to_numeric(srts_df['fromlatitude'], errors='coerce')
+    srts_lon = pd.to_numeric(srts_df['fromlongitude'], errors='coerce')
+    located = srts_lat.notna().to_numpy()
+    srts_with_coords = srts_df[located].assign(latitude=srts_lat[located],
+                                               longitude=srts_lon[located])
     srts_prox = compute_proximity(srts_with_coords, cb5_crashes)
 
     return signal_prox, srts_prox
 
 
+def proximity_mann_whitney(signal_prox, srts_prox):
+    """Mann-Whitney U on crashes_150m, denied vs approved, per dataset.
+
+    Returns {'Signal Studies': (U, p), 'SRTS': (U, p)}; computed once in
+    main() and shared by the summary, Chart 09 and Table 09b.
+    """
+    results = {}
+    for label, df in [('Signal Studies', signal_prox), ('SRTS', srts_prox)]:
+        located = df.loc[df['latitude'].notna()]
+        results[label] = _mann_whitney_u(
+            located.loc[located['outcome'] == 'denied', 'crashes_150m'].dropna(),
+            located.loc[located['outcome'] == 'approved', 'crashes_150m'].dropna())
+    return results
+
+
 # ============================================================
 # Step 3: Maps (Folium)
 # ============================================================
@@ -1079,6 +1179,7 @@ def _make_legend_html(items):
     return html
 
 
+@functools.lru_cache(maxsize=1)
 def _load_cb5_boundary():
     """Load CB5 boundary GeoJSON, downloading if needed."""
     if os.path.exists(CB5_BOUNDARY_PATH):
@@ -1096,8 +1197,11 @@ def _load_cb5_boundary():
     for feature in all_districts.get('features', []):
         if feature.get('properties', {}).get('GEOCODE') == 405:
             cb5_geojson = {"type": "FeatureCollection", "features": [feature]}
-            with open(CB5_BOUNDARY_PATH, 'w') as f:
+            # Write then rename so an interrupted download never leaves a partial file
+            tmp_path = f"{CB5_BOUNDARY_PATH}.tmp"
+            with open(tmp_path, 'w') as f:
                 json.dump(cb5_geojson, f)
+            os.replace(tmp_path, CB5_BOUNDARY_PATH)
             print(f"    Saved CB5 boundary to {CB5_BOUNDARY_PATH}")
             return cb5_geojson
 
@@ -1132,8 +1236,8 @@ def _compute_before_after(data):
     """
     print("    Computing before-after analysis for installed locations...")
 
-    cb5_studies_full = pd.read_csv(f'{OUTPUT_DIR}/data_cb5_signal_studies.csv', low_memory=False)
-    cb5_studies_full['outcome'] = cb5_studies_full['statusdescription'].apply(_classify_outcome)
+    cb5_studies_full = _read_cb5_studies().copy()
+    cb5_studies_full['outcome'] = _classify_outcomes(cb5_studies_full['statusdescription'])
     approved = cb5_studies_full[
         (cb5_studies_full['outcome'] == 'approved') &
         (cb5_studies_full['requesttype'] != 'Accessible Pedestrian Signal')
@@ -1144,82 +1248,85 @@ def _compute_before_after(data):
         approved['aw_installdate'].notna() | approved['signalinstalldate'].notna()
     ].copy()
     installed['install_date'] = pd.to_datetime(
-        installed['aw_installdate'].fillna(installed['signalinstalldate']), errors='coerce')
+        installed['aw_installdate'].fillna(installed['signalinstalldate']),
+        format=SOCRATA_DATE_FORMAT, errors='coerce')
     installed = installed.drop_duplicates(subset='referencenumber')
 
-    # Merge coordinates from geocode cache
-    cache = pd.read_csv(GEOCODE_CACHE_PATH, low_memory=False)
-    installed = installed.merge(
-        cache[['referencenumber', 'latitude', 'longitude']].drop_duplicates('referencenumber'),
-        on='referencenumber', how='left', suffixes=('_orig', ''))
-    installed = installed[installed['latitude'].notna() & installed['longitude'].notna()].copy()
+    # Coordinates from the geocode cache, looked up by reference number
+    cache = _read_geocode_cache(columns=['referencenumber', 'latitude', 'longitude'])
+    coords = cache.drop_duplicates('referencenumber').set_index('referencenumber')
+    installed['latitude'] = installed['referencenumber'].map(coords['latitude'])
+    installed['longitude'] = installed['referencenumber'].map(coords['longitude'])
+    installed = installed[installed['latitude'].notna() & installed['longitude'].notna()]
 
     # Crash arrays for vectorized computation
     cb5_crashes = data['cb5_crashes']
     crash_lats = cb5_crashes['latitude'].values
     crash_lons = cb5_crashes['longitude'].values
-    crash_dates = cb5_crashes['crash_date'].values
+    # Dates as int64 microsecond ticks so the window masks are integer compares
+    crash_ticks = cb5_crashes['crash_date'].to_numpy(dtype='datetime64[us]').view(np.int64)
     crash_injured = cb5_crashes['number_of_persons_injured'].values
-    crash_ped_inj = cb5_crashes['number_of_pedestrians_injured'].values
 
     DATA_START = pd.Timestamp('2020-01-01')
     DATA_END = cb5_crashes['crash_date'].max()
     if pd.isna(DATA_END):
         DATA_END = pd.Timestamp('2025-12-31')
 
-    results = []
-    for _, row in installed.iterrows():
-        lat, lon = row['latitude'], row['longitude']
-        install_dt = row['install_date']
-
-        dists = _haversine_vectorized(lat, lon, crash_lats, crash_lons)
-        within_150m = dists <= PROXIMITY_RADIUS_M
-
-        # Equal time windows before and after, capped at 24 months
-        months_before = (install_dt - DATA_START).days / 30.44
-        months_after = (DATA_END - install_dt).days / 30.44
-        window_months = min(months_before, months_after, 24)
-        window_days = int(window_months * 30.44)
-
-        before_start = install_dt - pd.Timedelta(days=window_days)
-        after_end = install_dt + pd.Timedelta(days=window_days)
-
-        before_mask = (within_150m &
-                       (crash_dates >= np.datetime64(before_start)) &
-                       (crash_dates < np.datetime64(install_dt)))
-        after_mask = (within_150m &
-                      (crash_dates >= np.datetime64(install_dt)) &
-                      (crash_dates <= np.datetime64(after_end)))
-
-        before_crashes = int(before_mask.sum())
-        after_crashes = int(after_mask.sum())
-        before_inj = int(crash_injured[before_mask].sum())
-        after_inj = int(crash_injured[after_mask].sum())
-
-        if before_crashes > 0:
-            pct_change = ((after_crashes - before_crashes) / before_crashes) * 100
-        elif after_crashes > 0:
-            pct_change = 100.0
-        else:
-            pct_change = 0.0
-
-        results.append({
-            'referencenumber': row['referencenumber'],
-            'requesttype': row['requesttype'],
-            'mainstreet': row['mainstreet'],
-            'crossstreet1': row['crossstreet1'],
-            'daterequested': row.get('daterequested', None),
-            'install_date': install_dt,
-            'window_months': round(window_months, 1),
-            'before_crashes': before_crashes,
-            'after_crashes': after_crashes,
-            'crash_change': after_crashes - before_crashes,
-            'pct_change': round(pct_change, 1),
-            'before_injuries': before_inj,
-            'after_injuries': after_inj,
-            'latitude': lat,
-            'longitude': lon,
-        })
+    lat = installed['latitude'].to_numpy(dtype=float)
+    lon = installed['longitude'].to_numpy(dtype=float)
+    install_dt = installed['install_date']
+
+    # Equal time windows before and after, capped at 24 months
+    months_before = (install_dt - DATA_START).dt.days.to_numpy() / 30.44
+    months_after = (DATA_END - install_dt).dt.days.to_numpy() / 30.44
+    window_months = np.minimum(np.minimum(months_before, months_after), 24)
+    window_days = np.trunc(window_months * 30.44).astype('timedelta64[D]')
+
+    # Window bounds are computed as datetimes (NaT stays NaT) before viewing as ticks
+    install = install_dt.to_numpy(dtype='datetime64[us]')
+    before_start = (install - window_days).view(np.int64)
+    after_end = (install + window_days).view(np.int64)
+    install = install.view(np.int64)
+
+    # Only (site, crash) pairs within the radius need date checks
+    site_idx, crash_idx = _pairs_within_radius(lat, lon, crash_lats, crash_lons)
+    pair_dates = crash_ticks[crash_idx]
+    pair_install = install[site_idx]
+    before_mask = (pair_dates >= before_start[site_idx]) & (pair_dates < pair_install)
+    after_mask = (pair_dates >= pair_install) & (pair_dates <= after_end[site_idx])
+
+    n_sites = len(installed)
+    before_crashes = np.bincount(site_idx[before_mask], minlength=n_sites)
+    after_crashes = np.bincount(site_idx[after_mask], minlength=n_sites)
+    before_inj = np.bincount(site_idx[before_mask], weights=crash_injured[crash_idx[before_mask]],
+                             minlength=n_sites).astype(np.int64)
+    after_inj = np.bincount(site_idx[after_mask], weights=crash_injured[crash_idx[after_mask]],
+                            minlength=n_sites).astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.where(before_crashes > 0,
+                              (after_crashes - before_crashes) / before_crashes * 100,
+                              np.where(after_crashes > 0, 100.0, 0.0))
+
+    results = {
+        'referencenumber': installed['referencenumber'].to_numpy(),
+        'requesttype': installed['requesttype'].to_numpy(),
+        'mainstreet': installed['mainstreet'].to_numpy(),
+        'crossstreet1': installed['crossstreet1'].to_numpy(),
+        'daterequested': (installed['daterequested'].to_numpy()
+                          if 'daterequested' in installed.columns else None),
+        'install_date': install_dt.to_numpy(),
+        # Builtin round (not np.round) to keep the exact-decimal rounding
+        'window_months': [round(w, 1) for w in window_months.tolist()],
+        'before_crashes': before_crashes,
+        'after_crashes': after_crashes,
+        'crash_change': after_crashes - before_crashes,
+        'pct_change': [round(p, 1) for p in pct_change.tolist()],
+        'before_injuries': before_inj,
+        'after_injuries': after_inj,
+        'latitude': lat,
+        'longitude': lon,
+    }
 
     rdf = pd.DataFrame(results)
     decreased = (rdf['crash_change'] < 0).sum()
@@ -1245,10 +1352,13 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     search_entries = []  # Populated during marker loops for search feature
 
     # --- Base map: no-label tiles for print clarity ---
+    # Canvas renderer: thousands of crash CircleMarkers draw far faster on one
+    # <canvas> than as individual SVG paths.
     m = folium.Map(
         location=CB5_CENTER, zoom_start=CB5_ZOOM,
         tiles=None,
         control_scale=True,
+        prefer_canvas=True,
     )
     folium.TileLayer(
         tiles='https://{s}.basemaps.cartocdn.com/light_nolabels/{z}/{x}/{y}{r}.png',
@@ -1270,14 +1380,26 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     _popup_style = "font-family:'Times New Roman',Georgia,serif;font-size:12px;line-height:1.5;"
     _hr = "<hr style='border:0;border-top:1px solid #ccc;margin:4px 0;'>"
 
-    def _fmt_date(val):
-        """Format a date value to 'Mon DD, YYYY' or return 'N/A'."""
-        if pd.isna(val):
-            return 'N/A'
-        try:
-            return pd.to_datetime(val).strftime('%b %d, %Y')
-        except Exception:
-            return str(val)[:10]
+    def _str_col(df, col):
+        """Column as strings, with missing values (or a missing column) as ''."""
+        if col not in df.columns:
+            return pd.Series('', index=df.index)
+        return df[col].fillna('').astype(str)
+
+    def _fmt_date_col(df, col):
+        """Column formatted as 'Mon DD, YYYY'; missing values become 'N/A'.
+
+        Values that do not parse as dates fall back to their first 10 characters.
+        """
+        if col not in df.columns:
+            return pd.Series('N/A', index=df.index)
+        raw = df[col]
+        formatted = pd.to_datetime(raw, format='mixed', errors='coerce').dt.strftime('%b %d, %Y')
+        return formatted.fillna(raw.astype(str).str[:10].where(raw.notna(), 'N/A'))
+
+    def _prefixed(s, prefix):
+        """'<prefix><value><br>' where *s* is non-empty, else ''."""
+        return (prefix + s + '<br>').where(s != '', '')
 
     # --- Enrich signal_prox with dates from full CB5 studies data ---
     # The geocode cache may lack daterequested/statusdate (older caches).
@@ -1291,17 +1413,23 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
                     _date_source[['referencenumber', col]], on='referencenumber', how='left')
 
     # --- Precompute layer subsets for names and CSV export ---
-    _sig_denied = signal_prox[signal_prox['outcome'] == 'denied']
-    _sig_approved = signal_prox[signal_prox['outcome'] == 'approved']
-    _srts_denied = srts_prox[srts_prox['outcome'] == 'denied']
-    _srts_approved = srts_prox[srts_prox['outcome'] == 'approved']
-    n_sig_denied = _sig_denied['latitude'].notna().sum()
-    n_sig_approved = _sig_approved['latitude'].notna().sum()
-    n_srts_denied = _srts_denied['latitude'].notna().sum()
-    n_srts_approved = _srts_approved['latitude'].notna().sum()
+    # Only located rows are drawn or exported, so filter once with plain
+    # numpy boolean masks and count rows directly
+    def _located(df, outcome):
+        mask = (df['outcome'] == outcome).to_numpy() & df['latitude'].notna().to_numpy()
+        return df[mask]
+
+    _sig_denied = _located(signal_prox, 'denied')
+    _sig_approved = _located(signal_prox, 'approved')
+    _srts_denied = _located(srts_prox, 'denied')
+    _srts_approved = _located(srts_prox, 'approved')
+    n_sig_denied = len(_sig_denied)
+    n_sig_approved = len(_sig_approved)
+    n_srts_denied = len(_srts_denied)
+    n_srts_approved = len(_srts_approved)
 
     # --- Layer 1: Crash Dot Density (replaces heatmap) ---
-    crash_with_coords = cb5_crashes[cb5_crashes['latitude'].notna()].copy()
+    crash_with_coords = cb5_crashes[cb5_crashes['latitude'].notna()]
     crash_dots = folium.FeatureGroup(
         name=f'Injury Crashes (n={len(crash_with_coords):,}, 2020–2025)', show=True)
     # Jitter stacked dots so crashes at the same intersection spread apart
@@ -1309,79 +1437,97 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     rng = np.random.RandomState(42)
     jitter_lat = rng.uniform(-0.00005, 0.00005, len(crash_with_coords))
     jitter_lon = rng.uniform(-0.00005, 0.00005, len(crash_with_coords))
-    _crash_markers = []  # collect for reuse in clustered layer
-    for i, (_, crow) in enumerate(crash_with_coords.iterrows()):
-        injured = int(crow.get('number_of_persons_injured', 0))
-        killed = int(crow.get('number_of_persons_killed', 0))
-        # Size by severity: fatal=4, injury=2, other=1.5
-        if killed > 0:
-            r, color, opacity = 3.5, '#1a1a1a', 0.8
-        elif injured > 0:
-            r, color, opacity = 1.8, '#888888', 0.35
-        else:
-            r, color, opacity = 1.2, '#aaaaaa', 0.2
-
-        # --- Crash popup/tooltip ---
-        c_date = _fmt_date(crow.get('crash_date'))
-        c_time = str(crow.get('crash_time', '')).strip()
-        _on_raw = crow.get('on_street_name')
-        _off_raw = crow.get('off_street_name')
-        _cross_raw = crow.get('cross_street_name')
-        c_on = '' if pd.isna(_on_raw) else str(_on_raw).strip()
-        c_off = '' if pd.isna(_off_raw) else str(_off_raw).strip()
-        c_cross = '' if pd.isna(_cross_raw) else str(_cross_raw).strip()
-        if c_on and c_off:
-            c_loc = f"{c_on} & {c_off}"
-        elif c_on or c_off:
-            c_loc = c_on or c_off
-        elif c_cross:
-            c_loc = f"Near {c_cross}"
-        else:
-            c_loc = 'Location on map'
-        c_factor = str(crow.get('contributing_factor_vehicle_1', '') or '').strip()
-        c_veh1 = str(crow.get('vehicle_type_code1', '') or '').strip()
-        ped_inj = int(crow.get('number_of_pedestrians_injured', 0))
-        ped_k = int(crow.get('number_of_pedestrians_killed', 0))
-        cyc_inj = int(crow.get('number_of_cyclist_injured', 0))
-        cyc_k = int(crow.get('number_of_cyclist_killed', 0))
-        mot_inj = int(crow.get('number_of_motorist_injured', 0))
-        mot_k = int(crow.get('number_of_motorist_killed', 0))
-
-        severity_tag = ('<span style="color:#B44040;font-weight:bold;">FATAL</span>'
-                        if killed > 0 else
-                        '<span style="color:#cc8400;font-weight:bold;">INJURY</span>'
-                        if injured > 0 else 'Property damage')
-
-        crash_popup = (
-            f"<div style=\"{_popup_style}\">"
-            f"<b>{c_loc}</b><br>"
-            f"{c_date} at {c_time}<br>"
-            f"Severity: {severity_tag}"
-            f"{_hr}"
-            f"Pedestrians: {ped_inj} injured, {ped_k} killed<br>"
-            f"Cyclists: {cyc_inj} injured, {cyc_k} killed<br>"
-            f"Motorists: {mot_inj} injured, {mot_k} killed"
-            f"{_hr}"
-            f"Factor: {c_factor or 'N/A'}<br>"
-            f"Vehicle: {c_veh1 or 'N/A'}<br>"
-            f"<span style='color:#666;font-size:10px;'>Collision ID: {crow.get('collision_id', 'N/A')}</span>"
-            f"</div>"
-        )
-        _sev = 'Fatal' if killed > 0 else f'{injured} injured' if injured > 0 else 'Crash'
-        crash_tooltip = f"{c_loc} — {_sev}, {c_date}"
-
-        # Store popup/tooltip for reuse in clustered layer
-        _crash_markers.append((crow['latitude'], crow['longitude'],
-                               color, opacity, crash_popup, crash_tooltip))
-
-        folium.CircleMarker(
-            [crow['latitude'] + jitter_lat[i],
-             crow['longitude'] + jitter_lon[i]], radius=r,
-            color=color, fill=True, fill_color=color,
-            fill_opacity=opacity, weight=0.3,
-            popup=folium.Popup(crash_popup, max_width=320),
-            tooltip=crash_tooltip,
-        ).add_to(crash_dots)
+    crash_lat_arr = crash_with_coords['latitude'].to_numpy()
+    crash_lon_arr = crash_with_coords['longitude'].to_numpy()
+
+    # Severity styling and popup/tooltip text for every crash, vectorized
+    injured = crash_with_coords['number_of_persons_injured'].to_numpy()
+    killed = crash_with_coords['number_of_persons_killed'].to_numpy()
+    severity = [killed > 0, injured > 0]
+    # Dot style per severity level (fatal, injury, other); size: fatal=4, injury=2, other=1.5
+    dot_styles = [
+        {'radius': radius, 'color': color, 'fill': True, 'fillColor': color,
+         'fillOpacity': opacity, 'weight': 0.3}
+        for radius, color, opacity in [(3.5, '#1a1a1a', 0.8), (1.8, '#888888', 0.35),
+                                       (1.2, '#aaaaaa', 0.2)]
+    ]
+    level_arr = np.select(severity, [0, 1], 2)
+    severity_tag_arr = np.select(severity, [
+        '<span style="color:#B44040;font-weight:bold;">FATAL</span>',
+        '<span style="color:#cc8400;font-weight:bold;">INJURY</span>',
+    ], 'Property damage')
+    sev_arr = np.select(severity, ['Fatal', pd.Series(injured).astype(str) + ' injured'], 'Crash')
+
+    c_date_arr = crash_with_coords['crash_date'].dt.strftime('%b %d, %Y').fillna('N/A')
+    c_on = _str_col(crash_with_coords, 'on_street_name').str.strip()
+    c_off = _str_col(crash_with_coords, 'off_street_name').str.strip()
+    c_cross = _str_col(crash_with_coords, 'cross_street_name').str.strip()
+    c_loc_arr = np.select(
+        [(c_on != '') & (c_off != ''), c_on != '', c_off != '', c_cross != ''],
+        [c_on + ' & ' + c_off, c_on, c_off, 'Near ' + c_cross],
+        'Location on map')
+
+    c_loc = pd.Series(c_loc_arr, index=crash_with_coords.index)
+    c_factor = _str_col(crash_with_coords, 'contributing_factor_vehicle_1').str.strip()
+    c_veh1 = _str_col(crash_with_coords, 'vehicle_type_code1').str.strip()
+
+    def _people(kind):
+        """'<N> injured, <M> killed' for one road-user column pair."""
+        return (crash_with_coords[f'number_of_{kind}_injured'].astype(str) + ' injured, '
+                + crash_with_coords[f'number_of_{kind}_killed'].astype(str) + ' killed')
+
+    # Popup and tooltip HTML for every crash, built column-wise
+    crash_popups = (
+        f"<div style=\"{_popup_style}\">"
+        + "<b>" + c_loc + "</b><br>"
+        + c_date_arr + " at " + _str_col(crash_with_coords, 'crash_time').str.strip() + "<br>"
+        + "Severity: " + severity_tag_arr
+        + _hr
+        + "Pedestrians: " + _people('pedestrians') + "<br>"
+        + "Cyclists: " + _people('cyclist') + "<br>"
+        + "Motorists: " + _people('motorist')
+        + _hr
+        + "Factor: " + c_factor.where(c_factor != '', 'N/A') + "<br>"
+        + "Vehicle: " + c_veh1.where(c_veh1 != '', 'N/A') + "<br>"
+        + "<span style='color:#666;font-size:10px;'>Collision ID: "
+        + crash_with_coords['collision_id'].astype(str) + "</span>"
+        + "</div>"
+    )
+    crash_tooltips = c_loc + " — " + sev_arr + ", " + c_date_arr
+
+    crash_props = [
+        {'level': level, 'popup': popup_html, 'tooltip': tooltip}
+        for level, popup_html, tooltip in zip(level_arr.tolist(), crash_popups, crash_tooltips)
+    ]
+
+    def _point_features(lons, lats):
+        return [
+            {'type': 'Feature', 'id': i,
+             'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+             'properties': props}
+            for i, (lon, lat, props) in enumerate(zip(lons.tolist(), lats.tolist(), crash_props))
+        ]
+
+    crash_features = _point_features(crash_lon_arr + jitter_lon, crash_lat_arr + jitter_lat)
+    # Same crashes without jitter, for the clustered layer
+    cluster_features = _point_features(crash_lon_arr, crash_lat_arr)
+    # Bind each point's prebuilt popup/tooltip HTML as-is (GeoJsonPopup and
+    # GeoJsonTooltip would wrap it in a field table with their own CSS)
+    bind_crash_popup = JsCode("""
+    function(feature, layer) {
+        layer.bindPopup(feature.properties.popup, {maxWidth: 320});
+        layer.bindTooltip(feature.properties.tooltip, {sticky: true});
+    }
+    """)
+
+    # One GeoJSON layer instead of a CircleMarker per crash: Leaflet parses a
+    # single FeatureCollection and folium emits one style switch, not N markers
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': crash_features},
+        marker=folium.CircleMarker(),
+        style_function=lambda feature: dot_styles[feature['properties']['level']],
+        on_each_feature=bind_crash_popup,
+    ).add_to(crash_dots)
     crash_dots.add_to(m)
 
     # --- Clustered crash layer (off by default, for analysis) ---
@@ -1411,180 +1557,185 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
             'spiderfyDistanceMultiplier': 1.5,
         },
     )
-    for lat, lon, color, opacity, popup_html, tooltip_text in _crash_markers:
-        d = 6 if color == '#1a1a1a' else 5 if color == '#888888' else 4
-        icon_html = (f'<div style="width:{d}px;height:{d}px;background:{color};'
-                     f'border-radius:50%;opacity:{opacity};"></div>')
-        folium.Marker(
-            [lat, lon],
-            icon=folium.DivIcon(html=icon_html, icon_size=(d, d),
-                                icon_anchor=(d // 2, d // 2)),
-            popup=folium.Popup(popup_html, max_width=320),
-            tooltip=tooltip_text,
-        ).add_to(crash_cluster)
+    # Small dot icon per severity level, applied to each point's DivIcon
+    cluster_icons = [
+        {'html': (f'<div style="width:{d}px;height:{d}px;background:{style["color"]};'
+                  f'border-radius:50%;opacity:{style["fillOpacity"]};"></div>'),
+         'iconSize': [d, d], 'iconAnchor': [d // 2, d // 2]}
+        for d, style in zip([6, 5, 4], dot_styles)
+    ]
+    # Points are fed to the cluster as one GeoJSON layer (markercluster flattens
+    # it). Popups are bound per point because the GeoJSON group itself is never
+    # on the map, so a group-level bindPopup would not open.
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': cluster_features},
+        marker=folium.Marker(icon=folium.DivIcon()),
+        style_function=lambda feature: cluster_icons[feature['properties']['level']],
+        on_each_feature=bind_crash_popup,
+    ).add_to(crash_cluster)
     crash_cluster.add_to(crash_clustered)
     crash_clustered.add_to(m)
 
-    # --- Helper: build signal study popup ---
-    def _signal_popup(row, outcome_label, outcome_color):
-        ref = row.get('referencenumber', 'N/A')
-        req_date = _fmt_date(row.get('daterequested'))
-        status_date = _fmt_date(row.get('statusdate'))
-        req_type = row.get('requesttype', 'N/A')
-        status_desc = str(row.get('statusdescription', '') or '').strip()
-        findings = str(row.get('findings', '') or '').strip()
-        fatalities = int(row.get('fatalities_150m', 0))
-        ped_inj = int(row.get('ped_injuries_150m', 0))
-        school = str(row.get('schoolname', '') or '').strip()
-        vz = 'Yes' if row.get('visionzero') == 'Yes' else ''
-        loc = f"{row.get('mainstreet', '')} & {row.get('crossstreet1', '')}"
-
-        extras = ''
-        if school:
-            extras += f"School: {school}<br>"
-        if vz:
-            extras += f"Vision Zero priority: Yes<br>"
-        if findings:
-            extras += f"Findings: {findings}<br>"
-
+    # --- Helper: build signal study popups (one string per row) ---
+    def _signal_popups(df, outcome_label, outcome_color):
+        loc = _str_col(df, 'mainstreet') + ' & ' + _str_col(df, 'crossstreet1')
+        extras = (_prefixed(_str_col(df, 'schoolname').str.strip(), 'School: ')
+                  + np.where(_str_col(df, 'visionzero') == 'Yes', 'Vision Zero priority: Yes<br>', '')
+                  + _prefixed(_str_col(df, 'findings').str.strip(), 'Findings: '))
         return (
             f"<div style=\"{_popup_style}\">"
-            f"<b>{loc}</b><br>"
-            f"<span style='color:#666;font-size:10px;'>{ref}</span><br>"
-            f"Type: {req_type}<br>"
-            f"Outcome: <span style='color:{outcome_color};font-weight:bold;'>{outcome_label}</span>"
-            f"{_hr}"
-            f"Requested: {req_date}<br>"
-            f"Status date: {status_date}<br>"
-            f"Status: {status_desc}"
-            f"{_hr}"
-            f"{extras}"
-            f"<b>Within 150m (2020–2025):</b><br>"
-            f"Crashes: {int(row.get('crashes_150m', 0))}<br>"
-            f"Injuries: {int(row.get('injuries_150m', 0))}<br>"
-            f"Ped. injuries: {ped_inj}<br>"
-            f"Fatalities: {fatalities}"
-            f"</div>"
+            + "<b>" + loc + "</b><br>"
+            + "<span style='color:#666;font-size:10px;'>" + _str_col(df, 'referencenumber') + "</span><br>"
+            + "Type: " + _str_col(df, 'requesttype') + "<br>"
+            + f"Outcome: <span style='color:{outcome_color};font-weight:bold;'>{outcome_label}</span>"
+            + _hr
+            + "Requested: " + _fmt_date_col(df, 'daterequested') + "<br>"
+            + "Status date: " + _fmt_date_col(df, 'statusdate') + "<br>"
+            + "Status: " + _str_col(df, 'statusdescription').str.strip()
+            + _hr
+            + extras
+            + _crash_count_lines(df)
         )
 
+    def _crash_count_lines(df):
+        """'Within 150m' popup block from the proximity count columns."""
+        return (
+            "<b>Within 150m (2020–2025):</b><br>"
+            + "Crashes: " + df['crashes_150m'].astype(int).astype(str) + "<br>"
+            + "Injuries: " + df['injuries_150m'].astype(int).astype(str) + "<br>"
+            + "Ped. injuries: " + df['ped_injuries_150m'].astype(int).astype(str) + "<br>"
+            + "Fatalities: " + df['fatalities_150m'].astype(int).astype(str)
+            + "</div>"
+        )
+
+    # --- Helper: add one layer of request markers ---
+    def _add_request_markers(layer, df, outcome, popups, labels, tooltips,
+                             refs, types, radius, fill_opacity, weight):
+        """Add a CircleMarker per located row of *df* and register it for search.
+
+        Popups, labels, tooltips, refs and types are precomputed string Series
+        so the loop below only constructs markers.
+        """
+        color = COLORS[outcome]
+        lats = df['latitude'].to_numpy()
+        lons = df['longitude'].to_numpy()
+        markers = [
+            folium.CircleMarker(
+                [lat, lon], radius=radius,
+                color='#333333', fill=True, fill_color=color,
+                fill_opacity=fill_opacity, weight=weight,
+                popup=folium.Popup(popup_html, max_width=340),
+                tooltip=tooltip,
+            )
+            for lat, lon, popup_html, tooltip in zip(lats, lons, popups, tooltips)
+        ]
+        for mk in markers:
+            layer.add_child(mk)
+        search_entries.extend(
+            {'ref': ref, 'lat': lat, 'lon': lon, 'label': label,
+             'type': rtype, 'outcome': outcome}
+            for lat, lon, label, ref, rtype in zip(lats, lons, labels, refs, types))
+
+    def _add_signal_markers(layer, df, outcome):
+        labels = _str_col(df, 'mainstreet') + ' & ' + _str_col(df, 'crossstreet1')
+        types = _str_col(df, 'requesttype')
+        tooltips = labels + ' — ' + types + f' ({outcome.upper()})'
+        popups = _signal_popups(df, outcome.upper(), COLORS[outcome])
+        _add_request_markers(layer, df, outcome, popups, labels, tooltips,
+                             _str_col(df, 'referencenumber'), types,
+                             radius=6, fill_opacity=0.75, weight=1.5)
+
     # --- Layer 2: Denied Signal Studies ---
     denied_signals = folium.FeatureGroup(
         name=f'Denied Signal Studies (n={n_sig_denied:,}, 2020–2025)', show=True)
-    for _, row in signal_prox[signal_prox['outcome'] == 'denied'].iterrows():
-        if pd.isna(row['latitude']):
-            continue
-        popup_html = _signal_popup(row, 'DENIED', COLORS['denied'])
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']], radius=6,
-            color='#333333', fill=True, fill_color=COLORS['denied'],
-            fill_opacity=0.75, weight=1.5,
-            popup=folium.Popup(popup_html, max_width=340),
-            tooltip=f"{row.get('mainstreet', '')} & {row.get('crossstreet1', '')} — {row.get('requesttype', '')} (DENIED)"
-        ).add_to(denied_signals)
-        search_entries.append({'ref': row.get('referencenumber', ''), 'lat': row['latitude'],
-            'lon': row['longitude'], 'label': f"{row.get('mainstreet', '')} & {row.get('crossstreet1', '')}",
-            'type': row.get('requesttype', ''), 'outcome': 'denied'})
+    _add_signal_markers(denied_signals, _sig_denied, 'denied')
     denied_signals.add_to(m)
 
     # --- Layer 3: Approved Signal Studies ---
     approved_signals = folium.FeatureGroup(
         name=f'Approved Signal Studies (n={n_sig_approved:,}, 2020–2025)', show=True)
-    for _, row in signal_prox[signal_prox['outcome'] == 'approved'].iterrows():
-        if pd.isna(row['latitude']):
-            continue
-        popup_html = _signal_popup(row, 'APPROVED', COLORS['approved'])
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']], radius=6,
-            color='#333333', fill=True, fill_color=COLORS['approved'],
-            fill_opacity=0.75, weight=1.5,
-            popup=folium.Popup(popup_html, max_width=340),
-            tooltip=f"{row.get('mainstreet', '')} & {row.get('crossstreet1', '')} — {row.get('requesttype', '')} (APPROVED)"
-        ).add_to(approved_signals)
-        search_entries.append({'ref': row.get('referencenumber', ''), 'lat': row['latitude'],
-            'lon': row['longitude'], 'label': f"{row.get('mainstreet', '')} & {row.get('crossstreet1', '')}",
-            'type': row.get('requesttype', ''), 'outcome': 'approved'})
+    _add_signal_markers(approved_signals, _sig_approved, 'approved')
     approved_signals.add_to(m)
 
-    # --- Helper: build SRTS popup ---
-    def _srts_popup(row, outcome_label, outcome_color):
-        on_st = row.get('onstreet', '')
-        from_st = row.get('fromstreet', '')
-        to_st = row.get('tostreet', '')
-        req_date = _fmt_date(row.get('requestdate'))
-        closed_date = _fmt_date(row.get('closeddate'))
-        proj_status = str(row.get('projectstatus', '') or '').strip()
-        denial = str(row.get('denialreason', '') or '').strip()
-        install_date = _fmt_date(row.get('installationdate'))
-        proj_code = str(row.get('projectcode', '') or '').strip()
-        fatalities = int(row.get('fatalities_150m', 0))
-        ped_inj = int(row.get('ped_injuries_150m', 0))
-        direction = str(row.get('trafficdirectiondesc', '') or '').strip()
-
-        extras = ''
-        if denial:
-            extras += f"Denial reason: {denial}<br>"
-        if install_date != 'N/A':
-            extras += f"Installed: {install_date}<br>"
-        if direction:
-            extras += f"Traffic: {direction}<br>"
-
+    # --- Helper: build SRTS popups (one string per row) ---
+    def _srts_popups(df, outcome_label, outcome_color):
+        install_date = _fmt_date_col(df, 'installationdate')
+        extras = (_prefixed(_str_col(df, 'denialreason').str.strip(), 'Denial reason: ')
+                  + ('Installed: ' + install_date + '<br>').where(install_date != 'N/A', '')
+                  + _prefixed(_str_col(df, 'trafficdirectiondesc').str.strip(), 'Traffic: '))
         return (
             f"<div style=\"{_popup_style}\">"
-            f"<b>{on_st}</b> ({from_st} to {to_st})<br>"
-            f"<span style='color:#666;font-size:10px;'>{proj_code}</span><br>"
-            f"Outcome: <span style='color:{outcome_color};font-weight:bold;'>{outcome_label}</span>"
-            f"{_hr}"
-            f"Requested: {req_date}<br>"
-            f"Decision date: {closed_date}<br>"
-            f"Project status: {proj_status}"
-            f"{_hr}"
-            f"{extras}"
-            f"<b>Within 150m (2020–2025):</b><br>"
-            f"Crashes: {int(row.get('crashes_150m', 0))}<br>"
-            f"Injuries: {int(row.get('injuries_150m', 0))}<br>"
-            f"Ped. injuries: {ped_inj}<br>"
-            f"Fatalities: {fatalities}"
-            f"</div>"
+            + "<b>" + _str_col(df, 'onstreet') + "</b> (" + _str_col(df, 'fromstreet')
+            + " to " + _str_col(df, 'tostreet') + ")<br>"
+            + "<span style='color:#666;font-size:10px;'>" + _str_col(df, 'projectcode').str.strip() + "</span><br>"
+            + f"Outcome: <span style='color:{outcome_color};font-weight:bold;'>{outcome_label}</span>"
+            + _hr
+            + "Requested: " + _fmt_date_col(df, 'requestdate') + "<br>"
+            + "Decision date: " + _fmt_date_col(df, 'closeddate') + "<br>"
+            + "Project status: " + _str_col(df, 'projectstatus').str.strip()
+            + _hr
+            + extras
+            + _crash_count_lines(df)
         )
 
+    def _add_srts_markers(layer, df, outcome):
+        labels = (_str_col(df, 'onstreet') + ' (' + _str_col(df, 'fromstreet')
+                  + ' to ' + _str_col(df, 'tostreet') + ')')
+        tooltips = labels + f' — {outcome.upper()}'
+        popups = _srts_popups(df, outcome.upper(), COLORS[outcome])
+        _add_request_markers(layer, df, outcome, popups, labels, tooltips,
+                             _str_col(df, 'projectcode'),
+                             pd.Series('Speed Bump', index=df.index),
+                             radius=4, fill_opacity=0.6, weight=1)
+
     # --- Layer 4: Denied Speed Bumps ---
     denied_srts = folium.FeatureGroup(
         name=f'Denied Speed Bumps (n={n_srts_denied:,}, 2020–2025)', show=True)
-    for _, row in srts_prox[srts_prox['outcome'] == 'denied'].iterrows():
-        if pd.isna(row['latitude']):
-            continue
-        popup_html = _srts_popup(row, 'DENIED', COLORS['denied'])
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']], radius=4,
-            color='#333333', fill=True, fill_color=COLORS['denied'],
-            fill_opacity=0.6, weight=1,
-            popup=folium.Popup(popup_html, max_width=340),
-            tooltip=f"{row.get('onstreet', '')} ({row.get('fromstreet', '')} to {row.get('tostreet', '')}) — DENIED"
-        ).add_to(denied_srts)
-        search_entries.append({'ref': str(row.get('projectcode', '')), 'lat': row['latitude'],
-            'lon': row['longitude'], 'label': f"{row.get('onstreet', '')} ({row.get('fromstreet', '')} to {row.get('tostreet', '')})",
-            'type': 'Speed Bump', 'outcome': 'denied'})
+    _add_srts_markers(denied_srts, _srts_denied, 'denied')
     denied_srts.add_to(m)
 
     # --- Layer 5: Approved Speed Bumps ---
     approved_srts = folium.FeatureGroup(
         name=f'Approved Speed Bumps (n={n_srts_approved:,}, 2020–2025)', show=True)
-    for _, row in srts_prox[srts_prox['outcome'] == 'approved'].iterrows():
-        if pd.isna(row['latitude']):
-            continue
-        popup_html = _srts_popup(row, 'APPROVED', COLORS['approved'])
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']], radius=4,
-            color='#333333', fill=True, fill_color=COLORS['approved'],
-            fill_opacity=0.6, weight=1,
-            popup=folium.Popup(popup_html, max_width=340),
-            tooltip=f"{row.get('onstreet', '')} ({row.get('fromstreet', '')} to {row.get('tostreet', '')}) — APPROVED"
-        ).add_to(approved_srts)
-        search_entries.append({'ref': str(row.get('projectcode', '')), 'lat': row['latitude'],
-            'lon': row['longitude'], 'label': f"{row.get('onstreet', '')} ({row.get('fromstreet', '')} to {row.get('tostreet', '')})",
-            'type': 'Speed Bump', 'outcome': 'approved'})
+    _add_srts_markers(approved_srts, _srts_approved, 'approved')
     approved_srts.add_to(m)
 
+    # --- Helper: numbered markers (150m ring, center dot, rank label) ---
+    def _add_ranked_markers(layer, lats, lons, fill_color, popups, tooltips):
+        for rank, (lat, lon, popup_html, tooltip) in enumerate(
+                zip(lats, lons, popups, tooltips), 1):
+            # 150m radius circle (dashed outline, non-interactive)
+            folium.Circle(
+                [lat, lon],
+                radius=PROXIMITY_RADIUS_M,
+                color=fill_color, fill=True, fill_color=fill_color,
+                fill_opacity=0.08, weight=1.5, dash_array='5 3',
+                interactive=False,
+            ).add_to(layer)
+            # Center dot
+            folium.CircleMarker(
+                [lat, lon], radius=9,
+                color='#333333', fill=True, fill_color=fill_color,
+                fill_opacity=0.85, weight=2,
+                popup=folium.Popup(popup_html, max_width=300),
+                tooltip=tooltip,
+            ).add_to(layer)
+            # Rank label (non-interactive so it doesn't block clicks on markers below)
+            folium.Marker(
+                [lat, lon],
+                icon=folium.DivIcon(
+                    html=(f"<div style=\"font-family:'Times New Roman',Georgia,serif;"
+                          f"font-size:10px;font-weight:bold;color:white;"
+                          f"text-align:center;margin-top:-5px;"
+                          f"pointer-events:none;\">{rank}</div>"),
+                    icon_size=(20, 20), icon_anchor=(10, 10)),
+                interactive=False,
+            ).add_to(layer)
+
+    def _ints(s):
+        """Numeric Series as integer strings."""
+        return s.astype(int).astype(str)
+
     # --- Layer 6: DOT Effectiveness — before-after for installed locations ---
     before_after_df = None
     if data is not None:
@@ -1592,64 +1743,62 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
         effectiveness_fg = folium.FeatureGroup(
             name=f'DOT Effectiveness (n={len(before_after_df)}, Installed, 2020–2025)', show=False)
 
-        for _, ba in before_after_df.iterrows():
-            change = ba['crash_change']
-            pct = ba['pct_change']
-
-            # Color by outcome: green = decreased, gray = no change, amber = increased
-            if change < 0:
-                fill_color = '#2d7d46'  # strong green — crashes went down
-                outline = '#1a5c2e'
-                label = f"{abs(int(pct))}% fewer crashes"
-            elif change == 0:
-                fill_color = '#777777'  # neutral gray
-                outline = '#555555'
-                label = "No change"
-            else:
-                fill_color = '#cc8400'  # amber — crashes went up
-                outline = '#996300'
-                label = f"{int(pct)}% more crashes"
-
-            install_str = ba['install_date'].strftime('%b %d, %Y')
-            ref = ba.get('referencenumber', 'N/A')
-            req_date = _fmt_date(ba.get('daterequested'))
-            inj_change = ba['after_injuries'] - ba['before_injuries']
-            inj_pct = (inj_change / ba['before_injuries'] * 100) if ba['before_injuries'] > 0 else 0
-            inj_label = (f"{abs(int(inj_pct))}% fewer" if inj_change < 0
-                         else f"{int(inj_pct)}% more" if inj_change > 0
-                         else "No change")
-            popup_html = (
-                f"<div style=\"{_popup_style}\">"
-                f"<b>{ba['mainstreet']} & {ba['crossstreet1']}</b><br>"
-                f"<span style='color:#666;font-size:10px;'>{ref}</span><br>"
-                f"Type: {ba['requesttype']}<br>"
-                f"Requested: {req_date}<br>"
-                f"Installed: {install_str}"
-                f"{_hr}"
-                f"<b>Before-After Analysis</b> ({ba['window_months']:.0f}-mo. windows, 150m):<br>"
-                f"Crashes: {ba['before_crashes']} &rarr; {ba['after_crashes']} "
-                f"(<b style='color:{fill_color};'>{label}</b>)<br>"
-                f"Injuries: {ba['before_injuries']} &rarr; {ba['after_injuries']} ({inj_label})"
-                f"</div>"
-            )
-
-            # Marker size scaled by absolute crash volume (bigger = more data = more reliable)
-            marker_r = max(7, min(14, 5 + ba['before_crashes']))
+        ba = before_after_df
+        # Color by outcome: green = decreased, gray = no change, amber = increased
+        change = ba['crash_change'].to_numpy()
+        direction = [change < 0, change == 0]
+        fill_arr = np.select(direction, ['#2d7d46', '#777777'], '#cc8400')
+        outline_arr = np.select(direction, ['#1a5c2e', '#555555'], '#996300')
+        pct = ba['pct_change'].astype(int)
+        label = pd.Series(np.select(
+            direction, [pct.abs().astype(str) + '% fewer crashes', 'No change'],
+            pct.astype(str) + '% more crashes'), index=ba.index)
+
+        inj_change = ba['after_injuries'] - ba['before_injuries']
+        inj_pct = (inj_change / ba['before_injuries'].where(ba['before_injuries'] > 0) * 100).fillna(0).astype(int)
+        inj_label = np.select(
+            [inj_change < 0, inj_change > 0],
+            [inj_pct.abs().astype(str) + '% fewer', inj_pct.astype(str) + '% more'],
+            'No change')
+
+        loc = _str_col(ba, 'mainstreet') + ' & ' + _str_col(ba, 'crossstreet1')
+        popups = (
+            f"<div style=\"{_popup_style}\">"
+            + "<b>" + loc + "</b><br>"
+            + "<span style='color:#666;font-size:10px;'>" + _str_col(ba, 'referencenumber') + "</span><br>"
+            + "Type: " + _str_col(ba, 'requesttype') + "<br>"
+            + "Requested: " + _fmt_date_col(ba, 'daterequested') + "<br>"
+            + "Installed: " + ba['install_date'].dt.strftime('%b %d, %Y')
+            + _hr
+            + "<b>Before-After Analysis</b> (" + ba['window_months'].map('{:.0f}'.format)
+            + "-mo. windows, 150m):<br>"
+            + "Crashes: " + ba['before_crashes'].astype(str) + " &rarr; " + ba['after_crashes'].astype(str)
+            + " (<b style='color:" + fill_arr + ";'>" + label + "</b>)<br>"
+            + "Injuries: " + ba['before_injuries'].astype(str) + " &rarr; " + ba['after_injuries'].astype(str)
+            + " (" + inj_label + ")"
+            + "</div>"
+        )
+        tooltips = loc + ' — ' + label
+        # Marker size scaled by absolute crash volume (bigger = more data = more reliable)
+        marker_r = (ba['before_crashes'] + 5).clip(7, 14).tolist()
 
+        for lat, lon, fill_color, outline, r, popup_html, tooltip in zip(
+                ba['latitude'].to_numpy(), ba['longitude'].to_numpy(), fill_arr,
+                outline_arr, marker_r, popups, tooltips):
             # 150m radius circle (dashed outline, non-interactive)
             folium.Circle(
-                [ba['latitude'], ba['longitude']],
+                [lat, lon],
                 radius=PROXIMITY_RADIUS_M,
                 color=fill_color, fill=True, fill_color=fill_color,
                 fill_opacity=0.08, weight=1.5, dash_array='5 3',
                 interactive=False,
             ).add_to(effectiveness_fg)
             folium.CircleMarker(
-                [ba['latitude'], ba['longitude']], radius=marker_r,
+                [lat, lon], radius=r,
                 color=outline, fill=True, fill_color=fill_color,
                 fill_opacity=0.8, weight=2,
                 popup=folium.Popup(popup_html, max_width=320),
-                tooltip=f"{ba['mainstreet']} & {ba['crossstreet1']} — {label}"
+                tooltip=tooltip,
             ).add_to(effectiveness_fg)
 
         effectiveness_fg.add_to(m)
@@ -1657,73 +1806,51 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     # --- Layer 7: Top 15 Denied Signal Study Spotlight (default OFF) ---
     # Signal studies only — intersection-level precision. SRTS excluded due to
     # segment-based coordinates creating methodological issues with 150m overlap.
-    sig_denied = signal_prox[
-        (signal_prox['outcome'] == 'denied') & signal_prox['latitude'].notna()
+    # Narrow to the columns used below before copying
+    sig_denied = signal_prox.loc[
+        (signal_prox['outcome'] == 'denied') & signal_prox['latitude'].notna(),
+        ['mainstreet', 'crossstreet1', 'requesttype', 'latitude', 'longitude',
+         'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
     ].copy()
-    sig_denied['location_name'] = sig_denied.apply(
-        lambda r: _normalize_intersection(r['mainstreet'], r['crossstreet1']), axis=1)
+    sig_denied['location_name'] = _normalize_intersections(
+        sig_denied['mainstreet'], sig_denied['crossstreet1'])
     sig_denied['dataset'] = 'Signal Study'
     sig_denied['request_info'] = sig_denied['requesttype']
 
     common_cols = ['location_name', 'dataset', 'request_info', 'latitude', 'longitude',
                    'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
-    spotlight_data = sig_denied[common_cols].copy()
+    spotlight_data = sig_denied[common_cols]
     # De-duplicate: name-based then spatial
     spotlight_data = spotlight_data.sort_values('crashes_150m', ascending=False).drop_duplicates(
         subset=['location_name'], keep='first')
     spotlight_data = _spatial_dedup(spotlight_data, radius_m=150)
-    top15 = spotlight_data.nlargest(15, 'crashes_150m')
+    top15 = _top_k(spotlight_data, 'crashes_150m', 15)
 
     spotlight_fg = folium.FeatureGroup(name='Top 15 Denied Spotlight (2020–2025)', show=False)
-    for rank, (_, row) in enumerate(top15.iterrows(), 1):
-        # 150m radius circle
-        folium.Circle(
-            [row['latitude'], row['longitude']],
-            radius=PROXIMITY_RADIUS_M,
-            color=COLORS['denied'], fill=True, fill_color=COLORS['denied'],
-            fill_opacity=0.08, weight=1.5, dash_array='5 3',
-            interactive=False,
-        ).add_to(spotlight_fg)
-
-        popup_html = (
-            f"<div style=\"{_popup_style}\">"
-            f"<b>#{rank}: {row['location_name']}</b><br>"
-            f"Dataset: {row['dataset']}<br>"
-            f"Request: {row['request_info']}"
-            f"{_hr}"
-            f"<b>Within 150m:</b><br>"
-            f"Crashes: {int(row['crashes_150m'])}<br>"
-            f"Injuries: {int(row['injuries_150m'])}<br>"
-            f"Ped. injuries: {int(row['ped_injuries_150m'])}<br>"
-            f"Fatalities: {int(row['fatalities_150m'])}"
-            f"</div>"
-        )
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']], radius=9,
-            color='#333333', fill=True, fill_color=COLORS['denied'],
-            fill_opacity=0.85, weight=2,
-            popup=folium.Popup(popup_html, max_width=300),
-            tooltip=f"#{rank}: {row['location_name']} ({int(row['crashes_150m'])} crashes)"
-        ).add_to(spotlight_fg)
-
-        # Rank label (non-interactive so it doesn't block clicks on markers below)
-        folium.Marker(
-            [row['latitude'], row['longitude']],
-            icon=folium.DivIcon(
-                html=(f"<div style=\"font-family:'Times New Roman',Georgia,serif;"
-                      f"font-size:10px;font-weight:bold;color:white;"
-                      f"text-align:center;margin-top:-5px;"
-                      f"pointer-events:none;\">{rank}</div>"),
-                icon_size=(20, 20), icon_anchor=(10, 10)),
-            interactive=False,
-        ).add_to(spotlight_fg)
-
+    ranks = pd.Series(range(1, len(top15) + 1), index=top15.index).astype(str)
+    spot_popups = (
+        f"<div style=\"{_popup_style}\">"
+        + "<b>#" + ranks + ": " + top15['location_name'] + "</b><br>"
+        + "Dataset: " + top15['dataset'] + "<br>"
+        + "Request: " + top15['request_info']
+        + _hr
+        + "<b>Within 150m:</b><br>"
+        + "Crashes: " + _ints(top15['crashes_150m']) + "<br>"
+        + "Injuries: " + _ints(top15['injuries_150m']) + "<br>"
+        + "Ped. injuries: " + _ints(top15['ped_injuries_150m']) + "<br>"
+        + "Fatalities: " + _ints(top15['fatalities_150m'])
+        + "</div>"
+    )
+    spot_tooltips = ("#" + ranks + ": " + top15['location_name']
+                     + " (" + _ints(top15['crashes_150m']) + " crashes)")
+    _add_ranked_markers(spotlight_fg, top15['latitude'].to_numpy(), top15['longitude'].to_numpy(),
+                        COLORS['denied'], spot_popups, spot_tooltips)
     spotlight_fg.add_to(m)
 
     # --- Layer 8: Top 10 Crash Intersections (default OFF) ---
     crash_with_streets = crash_with_coords.dropna(subset=['on_street_name', 'off_street_name']).copy()
-    crash_with_streets['intersection'] = crash_with_streets.apply(
-        lambda r: _normalize_intersection(r['on_street_name'], r['off_street_name']), axis=1)
+    crash_with_streets['intersection'] = _normalize_intersections(
+        crash_with_streets['on_street_name'], crash_with_streets['off_street_name'])
     crash_agg = crash_with_streets.groupby('intersection').agg(
         crashes=('collision_id', 'count'),
         injuries=('number_of_persons_injured', 'sum'),
@@ -1736,46 +1863,23 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     top10_crashes = crash_agg.head(10)
 
     crash_top_fg = folium.FeatureGroup(
-        name=f'Top 10 Crash Intersections (2020\u20132025)', show=False)
-    for rank, (_, cr) in enumerate(top10_crashes.iterrows(), 1):
-        popup_html = (
-            f"<div style=\"{_popup_style}\">"
-            f"<b>#{rank}: {cr['intersection']}</b>"
-            f"{_hr}"
-            f"<b>Crashes:</b> {int(cr['crashes'])}<br>"
-            f"<b>Total injuries:</b> {int(cr['injuries'])}<br>"
-            f"Pedestrian: {int(cr['ped_injuries'])}<br>"
-            f"Cyclist: {int(cr['cyc_injuries'])}<br>"
-            f"<b>Fatalities:</b> {int(cr['fatalities'])}"
-            f"</div>"
-        )
-        # 150m radius circle (dashed outline, non-interactive)
-        folium.Circle(
-            [cr['lat'], cr['lon']],
-            radius=PROXIMITY_RADIUS_M,
-            color=COLORS['primary'], fill=True, fill_color=COLORS['primary'],
-            fill_opacity=0.08, weight=1.5, dash_array='5 3',
-            interactive=False,
-        ).add_to(crash_top_fg)
-        # Center dot
-        folium.CircleMarker(
-            [cr['lat'], cr['lon']], radius=9,
-            color='#333333', fill=True, fill_color=COLORS['primary'],
-            fill_opacity=0.85, weight=2,
-            popup=folium.Popup(popup_html, max_width=300),
-            tooltip=f"#{rank}: {cr['intersection']} ({int(cr['crashes'])} crashes)"
-        ).add_to(crash_top_fg)
-        # Rank label (non-interactive)
-        folium.Marker(
-            [cr['lat'], cr['lon']],
-            icon=folium.DivIcon(
-                html=(f"<div style=\"font-family:'Times New Roman',Georgia,serif;"
-                      f"font-size:10px;font-weight:bold;color:white;"
-                      f"text-align:center;margin-top:-5px;"
-                      f"pointer-events:none;\">{rank}</div>"),
-                icon_size=(20, 20), icon_anchor=(10, 10)),
-            interactive=False,
-        ).add_to(crash_top_fg)
+        name=f'Top 10 Crash Intersections (2020–2025)', show=False)
+    ranks = pd.Series(range(1, len(top10_crashes) + 1), index=top10_crashes.index).astype(str)
+    top_popups = (
+        f"<div style=\"{_popup_style}\">"
+        + "<b>#" + ranks + ": " + top10_crashes['intersection'] + "</b>"
+        + _hr
+        + "<b>Crashes:</b> " + _ints(top10_crashes['crashes']) + "<br>"
+        + "<b>Total injuries:</b> " + _ints(top10_crashes['injuries']) + "<br>"
+        + "Pedestrian: " + _ints(top10_crashes['ped_injuries']) + "<br>"
+        + "Cyclist: " + _ints(top10_crashes['cyc_injuries']) + "<br>"
+        + "<b>Fatalities:</b> " + _ints(top10_crashes['fatalities'])
+        + "</div>"
+    )
+    top_tooltips = ("#" + ranks + ": " + top10_crashes['intersection']
+                    + " (" + _ints(top10_crashes['crashes']) + " crashes)")
+    _add_ranked_markers(crash_top_fg, top10_crashes['lat'].to_numpy(), top10_crashes['lon'].to_numpy(),
+                        COLORS['primary'], top_popups, top_tooltips)
     crash_top_fg.add_to(m)
 
     # --- Legend (print-ready, no heatmap entry) ---
@@ -1826,16 +1930,19 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
     _sig_full = data['cb5_no_aps'] if data is not None else pd.DataFrame()
     _sig_enrich_cols = ['referencenumber', 'daterequested', 'statusdate', 'findings',
                         'schoolname', 'visionzero']
-    _sig_enrich = _sig_full[[c for c in _sig_enrich_cols if c in _sig_full.columns]].drop_duplicates('referencenumber')
+    _sig_enrich = (_sig_full[[c for c in _sig_enrich_cols if c in _sig_full.columns]]
+                   .drop_duplicates('referencenumber').set_index('referencenumber'))
     sig_cols = ['referencenumber', 'mainstreet', 'crossstreet1', 'requesttype',
                 'outcome', 'daterequested', 'statusdate', 'statusdescription',
                 'findings', 'schoolname', 'visionzero',
                 'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m',
                 'latitude', 'longitude']
     for outcome_label, subset in [('denied', _sig_denied), ('approved', _sig_approved)]:
-        _exp = subset[subset['latitude'].notna()].copy()
+        _exp = subset.copy()
+        # Fill only the fields the layer data lacks, by reference number
         if len(_sig_enrich) > 0:
-            _exp = _exp.merge(_sig_enrich, on='referencenumber', how='left', suffixes=('', '_orig'))
+            for col in [c for c in _sig_enrich.columns if c not in _exp.columns]:
+                _exp[col] = _exp['referencenumber'].map(_sig_enrich[col])
         _exp = _exp[[c for c in sig_cols if c in _exp.columns]]
         _exp['Source File'] = 'data_cb5_signal_studies.csv'
         _exp.to_csv(f'{OUTPUT_DIR}/map_layer_{outcome_label}_signals.csv', index=False)
@@ -1848,7 +1955,6 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
                  'latitude', 'longitude']
     for outcome_label, subset in [('denied', _srts_denied), ('approved', _srts_approved)]:
         _exp = subset[[c for c in srts_cols if c in subset.columns]].copy()
-        _exp = _exp[_exp['latitude'].notna()]
         _exp['Source File'] = 'srts_citywide.csv'
         _exp.to_csv(f'{OUTPUT_DIR}/map_layer_{outcome_label}_speed_bumps.csv', index=False)
 
@@ -1871,56 +1977,58 @@ def map_consolidated(signal_prox, srts_prox, cb5_crashes, data=None):
 # Step 4: Static Charts (Matplotlib)
 # ============================================================
 
-def chart_09_crash_proximity(signal_prox, srts_prox):
-    """Chart 09: Crash Proximity Comparison — denied vs approved."""
+def chart_09_crash_proximity(signal_prox, srts_prox, mann_whitney=None):
+    """Chart 09: Crash Proximity Comparison — denied vs approved.
+
+    mann_whitney: precomputed proximity_mann_whitney() results (computed here if None).
+    """
     print("  Generating Chart 09: Crash Proximity Analysis...")
+    if mann_whitney is None:
+        mann_whitney = proximity_mann_whitney(signal_prox, srts_prox)
 
     fig, axes = plt.subplots(1, 2, figsize=(14, 7))
     metrics = ['crashes_150m', 'injuries_150m', 'ped_injuries_150m']
     metric_labels = ['Crashes', 'Injuries', 'Ped. Injuries']
 
-    for ax_idx, (df, title_prefix) in enumerate([
-        (signal_prox, 'QCB5 Signal Studies'),
-        (srts_prox, 'QCB5 Speed Bumps')
+    for ax_idx, (df, title_prefix, mw_key) in enumerate([
+        (signal_prox, 'QCB5 Signal Studies', 'Signal Studies'),
+        (srts_prox, 'QCB5 Speed Bumps', 'SRTS')
     ]):
         # Only count rows with coordinates — non-geocoded rows have no proximity data
         geocoded = df[df['latitude'].notna()]
-        denied = geocoded[geocoded['outcome'] == 'denied']
-        approved = geocoded[geocoded['outcome'] == 'approved']
+        counts = geocoded['outcome'].value_counts()
+        n_denied = int(counts.get('denied', 0))
+        n_approved = int(counts.get('approved', 0))
 
         x = np.arange(len(metrics))
         width = 0.35
 
-        denied_medians = [denied[m].median() for m in metrics]
-        approved_medians = [approved[m].median() for m in metrics]
+        # One grouped pass for all metric medians, both outcomes
+        medians = geocoded.groupby('outcome')[metrics].median().reindex(['denied', 'approved'])
+        denied_medians = medians.loc['denied'].to_numpy()
+        approved_medians = medians.loc['approved'].to_numpy()
 
         bars1 = axes[ax_idx].bar(x - width/2, denied_medians, width,
-                                  label=f'Denied (n={len(denied)})',
+                                  label=f'Denied (n={n_denied})',
                                   color=COLORS['denied'], edgecolor='black', zorder=3)
         bars2 = axes[ax_idx].bar(x + width/2, approved_medians, width,
-                                  label=f'Approved (n={len(approved)})',
+                                  label=f'Approved (n={n_approved})',
                                   color=COLORS['approved'], edgecolor='black', zorder=3)
 
         for bars in [bars1, bars2]:
-            for bar in bars:
-                val = bar.get_height()
-                axes[ax_idx].text(bar.get_x() + bar.get_width()/2, val + 0.2,
-                                  f'{val:.1f}', ha='center', va='bottom',
-                                  fontsize=9, fontweight='bold')
+            axes[ax_idx].bar_label(bars, fmt='%.1f', padding=5, fontsize=9, fontweight='bold')
 
         axes[ax_idx].set_xticks(x)
         axes[ax_idx].set_xticklabels(metric_labels, fontsize=10)
         axes[ax_idx].set_ylabel('Median Count within 150m', fontweight='bold')
-        axes[ax_idx].set_title(f'{title_prefix}\n(n={len(denied)+len(approved):,}, Median Crash Metrics, 2020–2025)',
+        axes[ax_idx].set_title(f'{title_prefix}\n(n={n_denied + n_approved:,}, Median Crash Metrics, 2020–2025)',
                                fontweight='bold', fontsize=12)
         axes[ax_idx].legend(loc='upper right')
         axes[ax_idx].xaxis.grid(False)
 
         # Statistical test for crashes_150m — placed below legend
-        denied_crashes = denied['crashes_150m'].dropna()
-        approved_crashes = approved['crashes_150m'].dropna()
-        if len(denied_crashes) > 0 and len(approved_crashes) > 0:
-            U, p = _mann_whitney_u(denied_crashes, approved_crashes)
+        U, p = mann_whitney[mw_key]
+        if not np.isnan(p):
             sig_text = f'p={p:.4f}' if p >= 0.0001 else 'p<0.0001'
             if p < 0.05:
                 sig_text += ' *'
@@ -1945,15 +2053,28 @@ def chart_09_crash_proximity(signal_prox, srts_prox):
     print("    Chart 09 saved.")
 
 
-def _normalize_intersection(street_a, street_b):
-    """Normalize intersection name by sorting streets alphabetically.
+def _normalize_intersections(streets_a, streets_b):
+    """Normalize intersection names by sorting each street pair alphabetically.
 
     Ensures 'Cooper Ave & Cypress Ave' == 'Cypress Ave & Cooper Ave'.
+    Takes two aligned Series of street names; missing names become ''.
     """
-    a = str(street_a).strip().title() if pd.notna(street_a) else ''
-    b = str(street_b).strip().title() if pd.notna(street_b) else ''
-    parts = sorted([a, b])
-    return f'{parts[0]} & {parts[1]}'
+    a = streets_a.astype(str).str.strip().str.title().where(streets_a.notna(), '')
+    b = streets_b.astype(str).str.strip().str.title().where(streets_b.notna(), '')
+    swap = a > b
+    return a.where(~swap, b) + ' & ' + b.where(~swap, a)
+
+
+# Chart label abbreviations (title-cased names, anywhere in the label)
+_LABEL_ABBREVS = {
+    'Avenue': 'Ave', 'Street': 'St', 'Road': 'Rd', 'Boulevard': 'Blvd',
+    'Turnpike': 'Tpke', 'Place': 'Pl', 'Lane': 'Ln', 'Drive': 'Dr',
+}
+_LABEL_ABBREV_RE = re.compile(r' (' + '|'.join(_LABEL_ABBREVS) + r')')
+
+
+def _abbrev_label(match):
+    return ' ' + _LABEL_ABBREVS[match.group(1)]
 
 
 def _spatial_dedup(df, radius_m=100):
@@ -1961,30 +2082,47 @@ def _spatial_dedup(df, radius_m=100):
     keep only the one with the highest crash count.
 
     Uses greedy approach: sort descending, skip any row within radius of
-    an already-selected row.
+    an already-selected row. Distances for all pairs are computed once; each
+    selected row then suppresses its neighbours with one boolean OR.
     """
     if len(df) == 0:
         return df
     sorted_df = df.sort_values('crashes_150m', ascending=False).reset_index(drop=True)
-    selected_idx = []
-    selected_coords = []
-
-    for i, row in sorted_df.iterrows():
-        lat, lon = row['latitude'], row['longitude']
-        too_close = False
-        for slat, slon in selected_coords:
-            # Approximate distance in meters
-            dlat = (lat - slat) * 111_320
-            dlon = (lon - slon) * 111_320 * math.cos(math.radians(lat))
-            dist = math.sqrt(dlat**2 + dlon**2)
-            if dist < radius_m:
-                too_close = True
-                break
-        if not too_close:
-            selected_idx.append(i)
-            selected_coords.append((lat, lon))
-
-    return sorted_df.loc[selected_idx].reset_index(drop=True)
+    lat = sorted_df['latitude'].to_numpy(dtype=float)
+    lon = sorted_df['longitude'].to_numpy(dtype=float)
+
+    # Approximate distance in meters from row j (selected) to row i (candidate),
+    # scaled by the candidate's latitude
+    dlat = (lat[None, :] - lat[:, None]) * 111_320
+    dlon = (lon[None, :] - lon[:, None]) * 111_320 * np.cos(np.radians(lat))[None, :]
+    near = np.sqrt(dlat**2 + dlon**2) < radius_m
+
+    keep = np.zeros(len(sorted_df), dtype=bool)
+    suppressed = np.zeros(len(sorted_df), dtype=bool)
+    for i in range(len(sorted_df)):
+        if not suppressed[i]:
+            keep[i] = True
+            suppressed |= near[i]
+
+    return sorted_df[keep].reset_index(drop=True)
+
+
+def _top_k(df, col, k):
+    """Rows with the k largest values of *col*, like ``nlargest(k, col)``.
+
+    Uses an O(n) partition to find the cutoff instead of sorting the whole
+    column; ties at the cutoff are kept in row order (nlargest keep='first').
+    """
+    vals = df[col].to_numpy(dtype=float)
+    n = len(vals)
+    if n <= k:
+        idx = np.arange(n)
+    else:
+        kth = np.partition(vals, n - k)[n - k]
+        idx = np.flatnonzero(vals > kth)
+        ties = np.flatnonzero(vals == kth)[:k - len(idx)]
+        idx = np.sort(np.concatenate([idx, ties]))
+    return df.iloc[idx[np.argsort(-vals[idx], kind='stable')]]
 
 
 def chart_09b_top_denied_ranking(signal_prox):
@@ -1997,15 +2135,18 @@ def chart_09b_top_denied_ranking(signal_prox):
     print("  Generating Chart 09b: Denied Signal Study Crash Ranking...")
 
     # Signal studies only — intersection-level precision with geocoded coordinates
-    sig_denied = signal_prox[
-        (signal_prox['outcome'] == 'denied') & signal_prox['latitude'].notna()
+    # Narrow to the columns used below before copying
+    sig_denied = signal_prox.loc[
+        (signal_prox['outcome'] == 'denied') & signal_prox['latitude'].notna(),
+        ['mainstreet', 'crossstreet1', 'latitude', 'longitude',
+         'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
     ].copy()
-    sig_denied['location_name'] = sig_denied.apply(
-        lambda r: _normalize_intersection(r['mainstreet'], r['crossstreet1']), axis=1)
+    sig_denied['location_name'] = _normalize_intersections(
+        sig_denied['mainstreet'], sig_denied['crossstreet1'])
 
     common_cols = ['location_name', 'latitude', 'longitude',
                    'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
-    denied = sig_denied[common_cols].copy()
+    denied = sig_denied[common_cols]
 
     # De-duplicate: name-based then spatial
     deduped = denied.sort_values('crashes_150m', ascending=False).drop_duplicates(
@@ -2013,23 +2154,15 @@ def chart_09b_top_denied_ranking(signal_prox):
     deduped = _spatial_dedup(deduped, radius_m=150)
     n_unique = len(deduped)
 
-    top15 = deduped.nlargest(15, 'crashes_150m').reset_index(drop=True)
-    top15['other_injuries'] = (top15['injuries_150m'] - top15['ped_injuries_150m']).clip(lower=0)
-
-    # Abbreviate street names for readability
-    def _abbrev_street(name):
-        return (name
-                .replace(' Avenue', ' Ave')
-                .replace(' Street', ' St')
-                .replace(' Road', ' Rd')
-                .replace(' Boulevard', ' Blvd')
-                .replace(' Turnpike', ' Tpke')
-                .replace(' Place', ' Pl')
-                .replace(' Lane', ' Ln')
-                .replace(' Drive', ' Dr'))
+    # Derived columns are computed once on the deduped frame and shared by both
+    # panels; labels abbreviate street names for readability (one regex pass)
+    deduped = deduped.assign(
+        other_injuries=(deduped['injuries_150m'] - deduped['ped_injuries_150m']).clip(lower=0),
+        label=deduped['location_name'].str.slice(0, 45).str.replace(
+            _LABEL_ABBREV_RE, _abbrev_label, regex=True),
+    )
 
-    top15['label'] = top15['location_name'].apply(
-        lambda n: _abbrev_street(n[:45]))
+    top15 = _top_k(deduped, 'crashes_150m', 15).reset_index(drop=True)
 
     fig, axes = plt.subplots(1, 2, figsize=(14, 8))
 
@@ -2039,9 +2172,8 @@ def chart_09b_top_denied_ranking(signal_prox):
 
     bars = axes[0].barh(y, top15_rev['crashes_150m'], color=COLORS['denied'],
                         edgecolor='black', zorder=3)
-    for i, val in enumerate(top15_rev['crashes_150m'].astype(int)):
-        axes[0].text(val + 0.5, i, str(val),
-                     va='center', ha='left', fontsize=9, fontweight='bold')
+    axes[0].bar_label(bars, labels=top15_rev['crashes_150m'].astype(int).astype(str).tolist(),
+                      padding=3, fontsize=9, fontweight='bold')
 
     axes[0].set_yticks(y)
     axes[0].set_yticklabels(top15_rev['label'], fontsize=9)
@@ -2050,10 +2182,7 @@ def chart_09b_top_denied_ranking(signal_prox):
     axes[0].yaxis.grid(False)
 
     # --- Right panel: Top 15 by injury count (independently sorted) ---
-    top15_inj = deduped.nlargest(15, 'injuries_150m').reset_index(drop=True)
-    top15_inj['other_injuries'] = (top15_inj['injuries_150m'] - top15_inj['ped_injuries_150m']).clip(lower=0)
-    top15_inj['label'] = top15_inj['location_name'].apply(
-        lambda n: _abbrev_street(n[:45]))
+    top15_inj = _top_k(deduped, 'injuries_150m', 15).reset_index(drop=True)
     top15_inj_rev = top15_inj.iloc[::-1].reset_index(drop=True)
     y_inj = np.arange(len(top15_inj_rev))
 
@@ -2064,13 +2193,11 @@ def chart_09b_top_denied_ranking(signal_prox):
 
     axes[1].barh(y_inj, ped_vals, color=COLORS['denied'],
                  edgecolor='black', linewidth=0.5, zorder=3, label='Pedestrian Injuries')
-    axes[1].barh(y_inj, other_vals, left=ped_vals, color=COLORS['crash_alt'],
-                 edgecolor='black', linewidth=0.5, zorder=3, label='Other Injuries')
-
-    for i, (p, o) in enumerate(zip(ped_vals, other_vals)):
-        total = p + o
-        axes[1].text(total + 0.5, i, str(total),
-                     va='center', ha='left', fontsize=9, fontweight='bold')
+    other_bars = axes[1].barh(y_inj, other_vals, left=ped_vals, color=COLORS['crash_alt'],
+                              edgecolor='black', linewidth=0.5, zorder=3, label='Other Injuries')
+    # Totals sit at the end of the stacked bar
+    axes[1].bar_label(other_bars, labels=[str(t) for t in ped_vals + other_vals],
+                      padding=3, fontsize=9, fontweight='bold')
 
     axes[1].set_yticks(y_inj)
     axes[1].set_yticklabels(top15_inj_rev['label'], fontsize=9)
@@ -2093,21 +2220,25 @@ def chart_09b_top_denied_ranking(signal_prox):
     print("    Chart 09b saved.")
 
 
-def chart_13_approval_vs_installation():
-    """Chart 13: DOT Outcomes — Denied vs Approved."""
+def chart_13_approval_vs_installation(cb5_srts_all=None):
+    """Chart 13: DOT Outcomes — Denied vs Approved.
+
+    cb5_srts_all is load_and_prepare_data()['cb5_srts_all']; loaded if omitted.
+    """
     print("  Generating Chart 13: DOT Outcomes...")
 
     # --- Signal Studies ---
-    sig = pd.read_csv(f'{OUTPUT_DIR}/data_cb5_signal_studies.csv', low_memory=False)
-    sig['outcome'] = sig['statusdescription'].apply(_classify_outcome)
-    sig_resolved = sig[sig['outcome'].isin(['denied', 'approved'])]
-    sig_no_aps = sig_resolved[sig_resolved['requesttype'] != 'Accessible Pedestrian Signal']
+    # Only two columns are needed for the counts; read them off the shared frame
+    sig = _read_cb5_studies()
+    sig_outcome = _classify_outcomes(sig['statusdescription'])
+    not_aps = sig['requesttype'] != 'Accessible Pedestrian Signal'
 
-    sig_denied = (sig_no_aps['outcome'] == 'denied').sum()
-    sig_approved = (sig_no_aps['outcome'] == 'approved').sum()
+    sig_denied = ((sig_outcome == 'denied') & not_aps).sum()
+    sig_approved = ((sig_outcome == 'approved') & not_aps).sum()
+    n_sig_resolved = sig_denied + sig_approved
 
     # --- SRTS (full pipeline: cb=405 + cross-street exclusion + polygon filter) ---
-    cb5_srts = _load_cb5_srts_full()
+    cb5_srts = cb5_srts_all if cb5_srts_all is not None else _load_cb5_srts_full()
     srts_resolved = cb5_srts[cb5_srts['segmentstatusdescription'].isin(['Not Feasible', 'Feasible'])]
     srts_denied = (srts_resolved['segmentstatusdescription'] == 'Not Feasible').sum()
     srts_feasible = (srts_resolved['segmentstatusdescription'] == 'Feasible').sum()
@@ -2119,11 +2250,9 @@ def chart_13_approval_vs_installation():
     sig_vals = [sig_denied, sig_approved]
     sig_colors = [COLORS['denied'], COLORS['approved']]
     bars = axes[0].bar(categories, sig_vals, color=sig_colors, edgecolor='black', zorder=3)
-    for bar, val in zip(bars, sig_vals):
-        axes[0].text(bar.get_x() + bar.get_width()/2, val + 2,
-                     str(val), ha='center', va='bottom', fontweight='bold', fontsize=11)
+    axes[0].bar_label(bars, padding=3, fontweight='bold', fontsize=11)
     sig_approval_rate = sig_approved / (sig_denied + sig_approved) * 100
-    axes[0].set_title(f'QCB5 Signal Studies\n(Excl. APS, n={len(sig_no_aps):,}, 2020–2025)', fontweight='bold', fontsize=12)
+    axes[0].set_title(f'QCB5 Signal Studies\n(Excl. APS, n={n_sig_resolved:,}, 2020–2025)', fontweight='bold', fontsize=12)
     axes[0].set_ylabel('Number of Requests', fontweight='bold')
     axes[0].xaxis.grid(False)
     axes[0].annotate(
@@ -2134,11 +2263,9 @@ def chart_13_approval_vs_installation():
     # Panel 2: SRTS
     srts_vals = [srts_denied, srts_feasible]
     bars2 = axes[1].bar(categories, srts_vals, color=sig_colors, edgecolor='black', zorder=3)
-    for bar, val in zip(bars2, srts_vals):
-        axes[1].text(bar.get_x() + bar.get_width()/2, val + 15,
-                     str(val), ha='center', va='bottom', fontweight='bold', fontsize=11)
+    axes[1].bar_label(bars2, padding=3, fontweight='bold', fontsize=11)
     srts_approval_rate = srts_feasible / (srts_denied + srts_feasible) * 100
-    _rd = pd.to_datetime(cb5_srts['requestdate'], errors='coerce')
+    _rd = cb5_srts['requestdate']  # parsed by _load_cb5_srts_full
     srts_min_yr = int(_rd.dt.year.min())
     srts_max_yr = min(int(_rd.dt.year.max()), 2025)
     axes[1].set_title(f'QCB5 Speed Bumps\n(n={len(srts_resolved):,}, {srts_min_yr}–{srts_max_yr})', fontweight='bold', fontsize=12)
@@ -2173,38 +2300,33 @@ def chart_13_approval_vs_installation():
     print("    Chart 13 saved.")
 
 
-def chart_15_srts_funnel():
-    """Chart 15: SRTS Approval Funnel — what happens after DOT approves a speed bump."""
+def chart_15_srts_funnel(cb5_srts_all=None):
+    """Chart 15: SRTS Approval Funnel — what happens after DOT approves a speed bump.
+
+    cb5_srts_all is load_and_prepare_data()['cb5_srts_all']; loaded if omitted.
+    """
     print("  Generating Chart 15: SRTS Approval Funnel...")
 
     # Full CB5 pipeline: cb=405 + cross-street exclusion + polygon filter
-    cb5 = _load_cb5_srts_full()
-    cb5['requestdate'] = pd.to_datetime(cb5['requestdate'], errors='coerce')
+    cb5 = cb5_srts_all if cb5_srts_all is not None else _load_cb5_srts_full()
     feasible = cb5[cb5['segmentstatusdescription'] == 'Feasible'].copy()
 
     min_yr = int(feasible['requestdate'].dt.year.min())
     max_yr = min(int(feasible['requestdate'].dt.year.max()), 2025)
 
-    feasible['install_dt'] = pd.to_datetime(feasible['installationdate'], errors='coerce')
-
-    # Categorize outcomes (mutually exclusive, must sum to total)
-    installed = feasible[
-        feasible['install_dt'].notna() &
-        ~feasible['projectstatus'].str.contains('Cancel|Reject|denied', case=False, na=False)
-    ]
-    cancelled = feasible[
-        feasible['projectstatus'].str.contains('Cancel|Reject|denied', case=False, na=False)
-    ]
-    still_open = feasible[
-        feasible['install_dt'].isna() &
-        ~feasible['projectstatus'].str.contains('Cancel|Reject|denied|Closed', case=False, na=False)
-    ]
+    feasible['install_dt'] = pd.to_datetime(feasible['installationdate'], format=SOCRATA_DATE_FORMAT, errors='coerce')
+
+    # Categorize outcomes (mutually exclusive, must sum to total);
+    # each status predicate is evaluated once
+    is_cancelled = feasible['projectstatus'].str.contains(
+        'Cancel|Reject|denied', case=False, na=False).to_numpy()
+    is_closed = feasible['projectstatus'].str.contains('Closed', case=False, na=False).to_numpy()
+    has_install = feasible['install_dt'].notna().to_numpy()
+    installed = feasible[has_install & ~is_cancelled]
+    cancelled = feasible[is_cancelled]
+    still_open = feasible[~has_install & ~is_cancelled & ~is_closed]
     # "Closed" without install date and without Cancel/Reject — administrative closures
-    closed_other = feasible[
-        feasible['install_dt'].isna() &
-        feasible['projectstatus'].str.contains('Closed', case=False, na=False) &
-        ~feasible['projectstatus'].str.contains('Cancel|Reject|denied', case=False, na=False)
-    ]
+    closed_other = feasible[~has_install & is_closed & ~is_cancelled]
 
     n_total = len(feasible)
     n_installed = len(installed)
@@ -2239,12 +2361,12 @@ def chart_15_srts_funnel():
 
     bars = axes[1].bar(categories, values, color=bar_colors, edgecolor='black', zorder=3, width=0.6)
 
-    for bar, val in zip(bars, values):
+    labels = []
+    for val in values:
         pct = val / n_total * 100
         pct_str = f'{pct:.1f}%' if pct < 1 else f'{pct:.0f}%'
-        axes[1].text(bar.get_x() + bar.get_width()/2, val + 3,
-                     f'{val}\n({pct_str})', ha='center', va='bottom',
-                     fontweight='bold', fontsize=11)
+        labels.append(f'{val}\n({pct_str})')
+    axes[1].bar_label(bars, labels=labels, padding=3, fontweight='bold', fontsize=11)
 
     axes[1].set_ylabel('Number of Requests', fontweight='bold')
     axes[1].set_title(f'Outcome of {n_total} Approved Requests', fontweight='bold', fontsize=12)
@@ -2252,7 +2374,7 @@ def chart_15_srts_funnel():
     axes[1].xaxis.grid(False)
 
     # Median wait annotation — position on the "Still Waiting" bar (last bar)
-    still_open_dt = pd.to_datetime(still_open['requestdate'], errors='coerce')
+    still_open_dt = still_open['requestdate']  # parsed by _load_cb5_srts_full
     waiting_bar_idx = len(categories) - 1
     if len(still_open_dt.dropna()) > 0:
         median_years = (pd.Timestamp.now() - still_open_dt).dt.days.median() / 365.25
@@ -2293,36 +2415,43 @@ def chart_15_srts_funnel():
 # Step 5: Data Tables
 # ============================================================
 
-def save_data_tables(signal_prox, srts_prox):
-    """Save CSV data tables for all Part 2 outputs."""
+def save_data_tables(signal_prox, srts_prox, mann_whitney=None):
+    """Save CSV data tables for all Part 2 outputs.
+
+    mann_whitney: precomputed proximity_mann_whitney() results (computed here if None).
+    """
     print("  Saving data tables...")
+    if mann_whitney is None:
+        mann_whitney = proximity_mann_whitney(signal_prox, srts_prox)
 
     # Table 09: Per-location crash proximity (with reference numbers for traceability)
-    sig_rows = signal_prox[signal_prox['latitude'].notna()].copy()
-    sig_rows['location_name'] = (
-        sig_rows['mainstreet'].fillna('') + ' & ' + sig_rows['crossstreet1'].fillna('')
-    ).str.title()
-    sig_rows['dataset'] = 'Signal Study'
-    sig_rows['reference_id'] = sig_rows['referencenumber']
-    sig_rows['request_year'] = sig_rows['year']
-    sig_rows['request_type'] = sig_rows['requesttype']
-    sig_rows['source_file'] = 'data_cb5_signal_studies.csv'
-
-    srts_rows = srts_prox[srts_prox['latitude'].notna()].copy()
-    srts_rows['location_name'] = srts_rows['onstreet'].fillna('').str.title()
-    srts_rows['dataset'] = 'SRTS'
-    srts_rows['reference_id'] = srts_rows['projectcode']
-    srts_rows['request_year'] = srts_rows['year']
-    srts_rows['request_type'] = 'Speed Bump'
-    srts_rows['source_file'] = 'srts_citywide.csv'
-
+    # Each side is built narrow with assign(); the dataset label comes from the
+    # concat keys rather than a per-frame column write.
     common_cols = ['reference_id', 'location_name', 'dataset', 'request_type', 'outcome',
                    'request_year', 'source_file', 'latitude', 'longitude',
                    'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
-    table_09 = pd.concat([
-        sig_rows[[c for c in common_cols if c in sig_rows.columns]],
-        srts_rows[[c for c in common_cols if c in srts_rows.columns]]
-    ], ignore_index=True)
+    carried_cols = ['outcome', 'latitude', 'longitude',
+                    'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
+    sig_rows = signal_prox[signal_prox['latitude'].notna()]
+    srts_rows = srts_prox[srts_prox['latitude'].notna()]
+    sig_part = sig_rows[carried_cols].assign(
+        reference_id=sig_rows['referencenumber'],
+        location_name=(sig_rows['mainstreet'].fillna('') + ' & '
+                       + sig_rows['crossstreet1'].fillna('')).str.title(),
+        request_type=sig_rows['requesttype'],
+        request_year=sig_rows['year'],
+        source_file='data_cb5_signal_studies.csv',
+    )
+    srts_part = srts_rows[carried_cols].assign(
+        reference_id=srts_rows['projectcode'],
+        location_name=srts_rows['onstreet'].fillna('').str.title(),
+        request_type='Speed Bump',
+        request_year=srts_rows['year'],
+        source_file='srts_citywide.csv',
+    )
+    table_09 = (pd.concat({'Signal Study': sig_part, 'SRTS': srts_part}, names=['dataset'])
+                .reset_index('dataset').reset_index(drop=True))
+    table_09 = table_09[common_cols]
     table_09 = table_09.sort_values('crashes_150m', ascending=False)
     table_09 = table_09.rename(columns={'source_file': 'Source File'})
     table_09.to_csv(f'{OUTPUT_DIR}/table_09_crash_proximity_by_location.csv', index=False)
@@ -2330,9 +2459,11 @@ def save_data_tables(signal_prox, srts_prox):
     # Table 09b: Aggregate comparison — denied vs approved
     rows = []
     for dataset_label, df in [('Signal Studies', signal_prox), ('SRTS', srts_prox)]:
+        # One grouping pass per dataset instead of a string-compare slice per outcome
+        by_outcome = dict(tuple(df[df['crashes_150m'].notna()].groupby('outcome', sort=False)))
         for outcome in ['denied', 'approved']:
-            subset = df[(df['outcome'] == outcome) & df['crashes_150m'].notna()]
-            if len(subset) == 0:
+            subset = by_outcome.get(outcome)
+            if subset is None:
                 continue
             rows.append({
                 'Dataset': dataset_label,
@@ -2349,11 +2480,8 @@ def save_data_tables(signal_prox, srts_prox):
     table_09b = pd.DataFrame(rows)
 
     # Add p-values
-    for dataset_label, df in [('Signal Studies', signal_prox), ('SRTS', srts_prox)]:
-        denied = df[(df['outcome'] == 'denied') & df['crashes_150m'].notna()]['crashes_150m']
-        approved = df[(df['outcome'] == 'approved') & df['crashes_150m'].notna()]['crashes_150m']
-        if len(denied) > 0 and len(approved) > 0:
-            _, p = _mann_whitney_u(denied, approved)
+    for dataset_label, (_, p) in mann_whitney.items():
+        if not np.isnan(p):
             mask = table_09b['Dataset'] == dataset_label
             table_09b.loc[mask, 'Mann-Whitney p-value (crashes)'] = round(p, 6)
 
@@ -2367,24 +2495,23 @@ def save_data_tables(signal_prox, srts_prox):
     # segment-based coordinates creating methodological issues with 150m overlap.
     sig_denied = signal_prox[
         (signal_prox['outcome'] == 'denied') & signal_prox['latitude'].notna()
-    ].copy()
-    sig_denied['location_name'] = sig_denied.apply(
-        lambda r: _normalize_intersection(r['mainstreet'], r['crossstreet1']), axis=1)
-    sig_denied['dataset'] = 'Signal Study'
-    sig_denied['request_type'] = sig_denied.get('requesttype', 'N/A')
-    sig_denied['reference_id'] = sig_denied['referencenumber']
-    sig_denied['request_year'] = sig_denied['year']
-    sig_denied['source_file'] = 'data_cb5_signal_studies.csv'
-
+    ]
     common_cols_c = ['reference_id', 'location_name', 'dataset', 'request_type',
                      'request_year', 'source_file', 'latitude', 'longitude',
                      'crashes_150m', 'injuries_150m', 'ped_injuries_150m', 'fatalities_150m']
-    combined = sig_denied[[c for c in common_cols_c if c in sig_denied.columns]].copy()
+    combined = sig_denied[carried_cols[1:]].assign(
+        location_name=_normalize_intersections(sig_denied['mainstreet'], sig_denied['crossstreet1']),
+        dataset='Signal Study',
+        request_type=sig_denied.get('requesttype', 'N/A'),
+        reference_id=sig_denied['referencenumber'],
+        request_year=sig_denied['year'],
+        source_file='data_cb5_signal_studies.csv',
+    )[common_cols_c]
     # De-duplicate: name-based then spatial
     combined = combined.sort_values('crashes_150m', ascending=False).drop_duplicates(
         subset=['location_name'], keep='first')
     combined = _spatial_dedup(combined, radius_m=150)
-    table_09c = combined.nlargest(25, 'crashes_150m').reset_index(drop=True)
+    table_09c = _top_k(combined, 'crashes_150m', 25).reset_index(drop=True)
     table_09c.index = table_09c.index + 1
     table_09c.index.name = 'Rank'
     table_09c = table_09c.rename(columns={'source_file': 'Source File'})
@@ -2437,6 +2564,7 @@ def main():
         signal_geo, data['cb5_srts'], data['cb5_crashes'])
 
     # Print summary stats
+    mann_whitney = proximity_mann_whitney(signal_prox, srts_prox)
     for label, df in [('Signal Studies', signal_prox), ('SRTS', srts_prox)]:
         denied = df[df['outcome'] == 'denied']
         approved = df[df['outcome'] == 'approved']
@@ -2445,7 +2573,7 @@ def main():
               f"{denied['injuries_150m'].median():.0f} injuries within 150m (n={len(denied)})")
         print(f"    Approved: median {approved['crashes_150m'].median():.0f} crashes, "
               f"{approved['injuries_150m'].median():.0f} injuries within 150m (n={len(approved)})")
-        U, p = _mann_whitney_u(denied['crashes_150m'].dropna(), approved['crashes_150m'].dropna())
+        U, p = mann_whitney[label]
         print(f"    Mann-Whitney U: p={p:.6f}" + (" *" if p < 0.05 else ""))
 
     # Step 3: Consolidated map (replaces former Maps 01-03)
@@ -2456,21 +2584,25 @@ def main():
     # Save before-after analysis table
     if before_after_df is not None and len(before_after_df) > 0:
         ba_out = before_after_df.copy()
-        ba_out['install_date'] = ba_out['install_date'].dt.strftime('%Y-%m-%d')
+        # ISO dates via one datetime64[D] -> str cast; NaT stays empty
+        install = ba_out['install_date']
+        ba_out['install_date'] = pd.Series(
+            install.to_numpy(dtype='datetime64[D]').astype(str), index=install.index
+        ).where(install.notna())
         ba_out['Source File'] = 'data_cb5_signal_studies.csv'
         ba_out.to_csv(f'{OUTPUT_DIR}/table_before_after_installed.csv', index=False)
         print(f"  Before-after table saved ({len(ba_out)} installed locations).")
 
     # Step 4: Static charts
     print("\nStep 4: Generating charts...")
-    chart_09_crash_proximity(signal_prox, srts_prox)
+    chart_09_crash_proximity(signal_prox, srts_prox, mann_whitney)
     chart_09b_top_denied_ranking(signal_prox)
-    chart_13_approval_vs_installation()
-    chart_15_srts_funnel()
+    chart_13_approval_vs_installation(data['cb5_srts_all'])
+    chart_15_srts_funnel(data['cb5_srts_all'])
 
     # Step 5: Data tables
     print("\nStep 5: Saving data tables...")
-    save_data_tables(signal_prox, srts_prox)
+    save_data_tables(signal_prox, srts_prox, mann_whitney)
 
     # Step 6: Data bundle
     print("\nStep 6: Creating data bundle...")
@@ -15,9 +15,14 @@ Datasets:
 Author: CB5 Safety Analysis Project
 """
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import time
 from datetime import datetime
 
 # === CONFIGURATION ===
@@ -26,6 +31,11 @@ OUTPUT_DIR = "output"
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Raw CSVs younger than this are reused instead of re-downloaded
+CACHE_TTL_SECONDS = 24 * 60 * 60
+# Rows per Socrata request; fetch_dataset pages through larger results
+PAGE_SIZE = 10000
+
 # NYC Open Data Socrata API endpoints
 DATASETS = {
     "signal_studies": {
@@ -69,15 +79,33 @@ DATASET_311 = {
 }
 
 
+def _new_session():
+    """Keep-alive session for one fetch_dataset call.
+
+    Each call (and so each download thread) gets its own session, since
+    requests.Session is not guaranteed thread-safe; its pages reuse the
+    connection. Transient errors are retried with backoff.
+    """
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        max_retries=Retry(total=3, backoff_factor=0.5,
+                          status_forcelist=[429, 500, 502, 503, 504]),
+    ))
+    # Optional Socrata app token lifts anonymous throttling
+    if os.environ.get('SOCRATA_APP_TOKEN'):
+        session.headers['X-App-Token'] = os.environ['SOCRATA_APP_TOKEN']
+    return session
+
+
 def fetch_dataset(endpoint, limit=None, where=None, select=None):
-    """Fetch data from NYC Open Data Socrata API."""
-    base_url = f"https://data.cityofnewyork.us/resource/{endpoint}.json"
-    params = {}
+    """Fetch data from NYC Open Data Socrata API.
 
-    if limit:
-        params["$limit"] = limit
-    else:
-        params["$limit"] = 100000  # Large default
+    Rows are requested in pages of PAGE_SIZE (ordered by :id so offsets are
+    stable) until *limit* rows are read or the dataset is exhausted.
+    """
+    base_url = f"https://data.cityofnewyork.us/resource/{endpoint}.json"
+    limit = limit or 100000  # Large default
+    params = {"$order": ":id"}
 
     if where:
         params["$where"] = where
@@ -85,14 +113,66 @@ def fetch_dataset(endpoint, limit=None, where=None, select=None):
     if select:
         params["$select"] = select
 
+    pages = []
+    offset = 0
     try:
-        response = requests.get(base_url, params=params, timeout=120)
-        response.raise_for_status()
-        return pd.DataFrame(response.json())
+        with _new_session() as session:
+            while offset < limit:
+                page_limit = min(PAGE_SIZE, limit - offset)
+                response = session.get(
+                    base_url, params={**params, "$limit": page_limit, "$offset": offset},
+                    timeout=120)
+                response.raise_for_status()
+                rows = response.json()
+                if rows:
+                    pages.append(pd.DataFrame(rows))
+                if len(rows) < page_limit:
+                    break
+                offset += page_limit
     except Exception as e:
         print(f"  ERROR fetching {endpoint}: {e}")
         return pd.DataFrame()
 
+    if not pages:
+        return pd.DataFrame()
+    return pd.concat(pages, ignore_index=True)
+
+
+def _fetched_at(path):
+    """Download time recorded for the raw CSV at *path*, or None.
+
+    Read from the <path>.fetched_at sidecar written by cached_fetch; file
+    mtimes are not used because git checkouts reset them.
+    """
+    try:
+        with open(f"{path}.fetched_at") as f:
+            return float(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def cached_fetch(path, endpoint, force_refresh=False, **kwargs):
+    """fetch_dataset() backed by the raw CSV at *path*.
+
+    Reuses the saved CSV when this script downloaded it less than
+    CACHE_TTL_SECONDS ago (read as strings, matching the Socrata JSON);
+    otherwise fetches and saves it. Committed snapshots without a
+    download record are always refreshed.
+    """
+    fetched_at = _fetched_at(path)
+    if (not force_refresh and fetched_at is not None and os.path.exists(path)
+            and time.time() - fetched_at < CACHE_TTL_SECONDS):
+        print(f"  Using cached {path} (pass --force-refresh to re-download)")
+        return pd.read_csv(path, dtype=str, low_memory=False)
+
+    df = fetch_dataset(endpoint, **kwargs)
+    if not df.empty:
+        df.to_csv(path, index=False)
+        with open(f"{path}.fetched_at", "w") as f:
+            f.write(f"{time.time():.0f}\n")
+        print(f"  Saved to {path}")
+    return df
+
 
 def explore_dataframe(df, name, show_samples=3):
     """Generate comprehensive exploration of a dataframe."""
@@ -103,9 +183,10 @@ def explore_dataframe(df, name, show_samples=3):
     print(f"\n[SHAPE] {df.shape[0]:,} rows x {df.shape[1]} columns")
 
     print(f"\n[COLUMNS] ({len(df.columns)} total):")
-    for i, col in enumerate(df.columns):
-        dtype = df[col].dtype
-        non_null = df[col].notna().sum()
+    # Non-null counts for every column in one pass
+    non_null_counts = df.notna().sum()
+    for i, (col, non_null) in enumerate(non_null_counts.items()):
+        dtype = df.dtypes[col]
         pct = (non_null / len(df)) * 100 if len(df) > 0 else 0
         print(f"  {i+1:2}. {col:<40} {str(dtype):<15} {non_null:>6,} non-null ({pct:.0f}%)")
 
@@ -121,19 +202,23 @@ def explore_dataframe(df, name, show_samples=3):
     categorical_hints = ['status', 'type', 'borough', 'description', 'category', 'reason']
     for col in df.columns:
         if any(hint in col.lower() for hint in categorical_hints):
-            if df[col].dtype == 'object' and df[col].notna().sum() > 0:
-                unique_count = df[col].nunique()
+            if pd.api.types.is_string_dtype(df[col].dtype) and non_null_counts[col] > 0:
+                # Free-text fields show >30 distinct values within a small
+                # sample; skip them before hashing the whole column
+                if df[col].dropna().head(2000).nunique() > 30:
+                    continue
+                vc = df[col].value_counts()
+                unique_count = len(vc)
                 if unique_count <= 30:  # Only show if reasonable number of categories
                     print(f"\n  >> {col} ({unique_count} unique values):")
-                    vc = df[col].value_counts().head(15)
-                    for val, count in vc.items():
+                    for val, count in vc.head(15).items():
                         pct = (count / len(df)) * 100
                         print(f"      {val:<50} {count:>6,} ({pct:>5.1f}%)")
 
     return df
 
 
-def main():
+def main(force_refresh=False):
     print("="*70)
     print("NYC DOT SAFETY DATA - COMPREHENSIVE EXPLORATION")
     print(f"Run Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -141,6 +226,32 @@ def main():
 
     all_data = {}
 
+    # The five downloads are independent network I/O, so they run
+    # concurrently; each section below explores its frame once all are in.
+    # name -> (raw CSV path, endpoint, fetch_dataset kwargs)
+    jobs = {
+        'signal_studies': (f"{DATA_DIR}/signal_studies_citywide.csv",
+                           DATASETS['signal_studies']['endpoint'], {}),
+        'srts': (f"{DATA_DIR}/srts_citywide.csv", DATASETS['srts']['endpoint'], {}),
+        'aps_installed': (f"{DATA_DIR}/aps_installed_citywide.csv",
+                          DATASETS['aps_installed']['endpoint'], {}),
+        # Only fetch recent Queens crashes to keep manageable
+        'crashes': (f"{DATA_DIR}/crashes_queens_2020plus.csv", DATASETS['crashes']['endpoint'], {
+            'where': "borough='QUEENS' AND crash_date >= '2020-01-01' AND number_of_persons_injured > 0",
+            'limit': 50000,
+        }),
+        # Get CB5 DOT 311 requests from 2020+
+        '311': (f"{DATA_DIR}/311_cb5_dot_2020plus.csv", DATASET_311['endpoint'], {
+            'where': "agency='DOT' AND community_board='05 QUEENS' AND created_date >= '2020-01-01'",
+            'limit': 50000,
+        }),
+    }
+    print(f"\nFetching {len(jobs)} datasets...")
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = {name: ex.submit(cached_fetch, path, endpoint, force_refresh, **kwargs)
+                   for name, (path, endpoint, kwargs) in jobs.items()}
+    frames = {name: f.result() for name, f in futures.items()}
+
     # =========================================================================
     # 1. SIGNAL STUDIES - Most important for denial analysis
     # =========================================================================
@@ -150,14 +261,10 @@ def main():
     print("#"*70)
     print(f"\nDocumentation: {DATASETS['signal_studies']['doc_url']}")
 
-    print("\nFetching CITYWIDE data (all boroughs, all time)...")
-    df_studies = fetch_dataset(DATASETS['signal_studies']['endpoint'])
+    print("\nCITYWIDE data (all boroughs, all time)")
+    df_studies = frames['signal_studies']
 
     if not df_studies.empty:
-        # Save raw data
-        df_studies.to_csv(f"{DATA_DIR}/signal_studies_citywide.csv", index=False)
-        print(f"  Saved to {DATA_DIR}/signal_studies_citywide.csv")
-
         all_data['signal_studies'] = explore_dataframe(df_studies, "Signal Studies (Citywide)")
 
         # Queens breakdown
@@ -186,13 +293,10 @@ def main():
     print("#"*70)
     print(f"\nDocumentation: {DATASETS['srts']['doc_url']}")
 
-    print("\nFetching CITYWIDE SRTS data...")
-    df_srts = fetch_dataset(DATASETS['srts']['endpoint'])
+    print("\nCITYWIDE SRTS data")
+    df_srts = frames['srts']
 
     if not df_srts.empty:
-        df_srts.to_csv(f"{DATA_DIR}/srts_citywide.csv", index=False)
-        print(f"  Saved to {DATA_DIR}/srts_citywide.csv")
-
         all_data['srts'] = explore_dataframe(df_srts, "Speed Reducer Tracking System")
 
         # CB5 breakdown (cb='405' for Queens CB5)
@@ -215,13 +319,10 @@ def main():
     print("#"*70)
     print(f"\nDocumentation: {DATASETS['aps_installed']['doc_url']}")
 
-    print("\nFetching APS installed locations...")
-    df_aps = fetch_dataset(DATASETS['aps_installed']['endpoint'])
+    print("\nAPS installed locations")
+    df_aps = frames['aps_installed']
 
     if not df_aps.empty:
-        df_aps.to_csv(f"{DATA_DIR}/aps_installed_citywide.csv", index=False)
-        print(f"  Saved to {DATA_DIR}/aps_installed_citywide.csv")
-
         all_data['aps_installed'] = explore_dataframe(df_aps, "APS Installed Locations")
 
         # Queens breakdown
@@ -243,18 +344,10 @@ def main():
     print("#"*70)
     print(f"\nDocumentation: {DATASETS['crashes']['doc_url']}")
 
-    # Only fetch recent Queens crashes to keep manageable
-    print("\nFetching Queens crashes (2020+, with injuries)...")
-    df_crashes = fetch_dataset(
-        DATASETS['crashes']['endpoint'],
-        where="borough='QUEENS' AND crash_date >= '2020-01-01' AND number_of_persons_injured > 0",
-        limit=50000
-    )
+    print("\nQueens crashes (2020+, with injuries)")
+    df_crashes = frames['crashes']
 
     if not df_crashes.empty:
-        df_crashes.to_csv(f"{DATA_DIR}/crashes_queens_2020plus.csv", index=False)
-        print(f"  Saved to {DATA_DIR}/crashes_queens_2020plus.csv")
-
         all_data['crashes'] = explore_dataframe(df_crashes, "Motor Vehicle Crashes (Queens 2020+)")
 
     # =========================================================================
@@ -267,18 +360,10 @@ def main():
     print("#"*70)
     print(f"\nDocumentation: {DATASET_311['doc_url']}")
 
-    # Get CB5 DOT 311 requests from 2020+
-    print("\nFetching CB5 DOT 311 requests (2020+)...")
-    df_311 = fetch_dataset(
-        DATASET_311['endpoint'],
-        where="agency='DOT' AND community_board='05 QUEENS' AND created_date >= '2020-01-01'",
-        limit=50000
-    )
+    print("\nCB5 DOT 311 requests (2020+)")
+    df_311 = frames['311']
 
     if not df_311.empty:
-        df_311.to_csv(f"{DATA_DIR}/311_cb5_dot_2020plus.csv", index=False)
-        print(f"  Saved to {DATA_DIR}/311_cb5_dot_2020plus.csv")
-
         all_data['311'] = explore_dataframe(df_311, "311 Requests (CB5 DOT 2020+)")
 
     # =========================================================================
@@ -289,10 +374,11 @@ def main():
     print("="*70)
     print(f"\nAll raw data saved to: {DATA_DIR}/")
     print("\nFiles created:")
-    for f in os.listdir(DATA_DIR):
-        if f.endswith('.csv'):
-            size = os.path.getsize(f"{DATA_DIR}/{f}") / (1024*1024)
-            print(f"  - {f} ({size:.1f} MB)")
+    with os.scandir(DATA_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.csv'):
+                size = entry.stat().st_size / (1024*1024)
+                print(f"  - {entry.name} ({size:.1f} MB)")
 
     print("\n" + "="*70)
     print("DOCUMENTATION LINKS")
@@ -309,4 +395,7 @@ def main():
 
 
 if __name__ == "__main__":
-    data = main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='re-download every dataset even if a fresh raw CSV exists')
+    data = main(force_refresh=parser.parse_args().force_refresh)